@@ -0,0 +1,364 @@
+"""
+Before / after comparisons of the optimisations, printed as tables: the legacy searches and
+map generation against their replacements, and A* against the other planners. Run them from
+the benchmark command line, e.g. `python benchmark_suite.py jps`.
+"""
+import heapq
+import random
+import time
+import tracemalloc
+from collections import deque
+
+import custom_constants as c
+from grid_model import GridModel
+
+# Legacy searches ________________________
+# The implementations the Grid used before the shared search core: every frontier
+# entry carries its own copy of the path. Kept here only as the "before" baseline.
+
+
+def legacy_bfs(grid, start, goal):
+    queue = deque([(start, [start])])
+    visited = {start}
+    while queue:
+        (x, y), path = queue.popleft()
+        if (x, y) == goal:
+            return path
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid.grid_size and 0 <= ny < grid.grid_size:
+                cell_id = grid.grid[ny][nx]
+                if (nx, ny) not in visited and cell_id != c.WALL_ID and cell_id != c.HIDRA_ID:
+                    visited.add((nx, ny))
+                    queue.append(((nx, ny), path + [(nx, ny)]))
+    return None
+
+
+def legacy_dfs(grid, start, goal):
+    stack = [(start, [start])]
+    visited = {start}
+    while stack:
+        (x, y), path = stack.pop()
+        if (x, y) == goal:
+            return path
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid.grid_size and 0 <= ny < grid.grid_size:
+                cell_id = grid.grid[ny][nx]
+                if (nx, ny) not in visited and cell_id != c.WALL_ID and cell_id != c.HIDRA_ID:
+                    visited.add((nx, ny))
+                    stack.append(((nx, ny), path + [(nx, ny)]))
+    return None
+
+
+def legacy_weighted(grid, start, goal, use_heuristic):
+    h = (lambda x, y: abs(x - goal[0]) + abs(y - goal[1])) if use_heuristic else (lambda x, y: 0)
+    heap = [(h(*start), 0, start, [start])]
+    visited = {start: 0}
+    while heap:
+        _, cost_so_far, (x, y), path = heapq.heappop(heap)
+        if (x, y) == goal:
+            return path
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid.grid_size and 0 <= ny < grid.grid_size:
+                cell_cost = c.CELL_COSTS.get(grid.grid[ny][nx], 1)
+                if cell_cost == float('inf'):
+                    continue
+                new_cost = cost_so_far + cell_cost
+                if (nx, ny) not in visited or new_cost < visited[(nx, ny)]:
+                    visited[(nx, ny)] = new_cost
+                    heapq.heappush(heap, (new_cost + h(nx, ny), new_cost, (nx, ny), path + [(nx, ny)]))
+    return None
+
+
+def legacy_place_obstacles(grid, player_pos, goal_pos, density, rng):
+    """
+    The obstacle placement create_auto_map used before: rejection sampling one cell at a
+    time, a BFS per attempt, and a cell-by-cell clear between attempts.
+    """
+    for _ in range(c.MAX_ATTEMPTS):
+        for yy in range(1, grid.grid_size - 1):
+            for xx in range(1, grid.grid_size - 1):
+                if (xx, yy) not in [player_pos, goal_pos]:
+                    grid.grid[yy][xx] = c.EMPTY_CELL_ID
+        num_obstacles = int((grid.grid_size - 2) * (grid.grid_size - 2) * density)
+        placed = 0
+        while placed < num_obstacles:
+            ox = rng.randint(1, grid.grid_size - 2)
+            oy = rng.randint(1, grid.grid_size - 2)
+            if (ox, oy) not in [player_pos, goal_pos] and grid.grid[oy][ox] == c.EMPTY_CELL_ID:
+                grid.grid[oy][ox] = rng.choice(c.OBSTACLE_TYPES)
+                placed += 1
+        if legacy_bfs(grid, player_pos, goal_pos):
+            return
+    for yy in range(1, grid.grid_size - 1):
+        for xx in range(1, grid.grid_size - 1):
+            if (xx, yy) not in [player_pos, goal_pos]:
+                grid.grid[yy][xx] = c.EMPTY_CELL_ID
+
+
+LEGACY_SEARCHES = {
+    'BFS': legacy_bfs,
+    'DFS': legacy_dfs,
+    'UCS': lambda grid, start, goal: legacy_weighted(grid, start, goal, use_heuristic=False),
+    'A*': lambda grid, start, goal: legacy_weighted(grid, start, goal, use_heuristic=True),
+}
+
+CURRENT_SEARCHES = {
+    'BFS': lambda grid, start, goal: grid.bfs(start, goal)[0],
+    'DFS': lambda grid, start, goal: grid.dfs(start, goal)[0],
+    'UCS': lambda grid, start, goal: grid.ucs(start, goal)[0],
+    'A*': lambda grid, start, goal: grid.astar(start, goal)[0],
+}
+
+
+# The legacy DFS copies paths that snake through most of an open map; beyond this
+# many cells a single run takes minutes and gigabytes, so it is skipped.
+LEGACY_DFS_MAX_CELLS = 100 * 100
+
+
+def measure(search, grid, start, goal, repeats=3):
+    """
+    Run one search and measure it.
+    Runtime is the best of `repeats` untraced runs, memory comes from one extra run under tracemalloc.
+    :return: runtime in seconds, peak traced memory in bytes, path length
+    """
+    runtime = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        path = search(grid, start, goal)
+        runtime = min(runtime, time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    search(grid, start, goal)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return runtime, peak, len(path) if path else 0
+
+
+def compare_path_reconstruction(grid_sizes=(100, 200, 400), place_obstacles=False, seed=0):
+    """
+    Compare the legacy path-copying searches with the parent-pointer search core,
+    player and goal in opposite corners.
+    Open maps (the default) are the worst case for both: the frontier is as wide as
+    it gets and the DFS path snakes through most of the grid.
+    """
+    random.seed(seed)
+    print(f"{'size':>5} {'algorithm':>9} {'before ms':>10} {'after ms':>10} {'before KiB':>11} {'after KiB':>10}")
+    for grid_size in grid_sizes:
+        grid = GridModel(grid_size)
+        grid.search_cache = None  # Repeated searches on an unchanged map must run, not hit the cache
+        start, goal = (1, 1), (grid_size - 2, grid_size - 2)
+        grid.create_auto_map(start, goal, place_obstacles=place_obstacles, monster_enabled=False)
+        for algorithm in LEGACY_SEARCHES:
+            after_time, after_peak, after_len = measure(CURRENT_SEARCHES[algorithm], grid, start, goal)
+            if algorithm == 'DFS' and grid_size * grid_size > LEGACY_DFS_MAX_CELLS:
+                print(f"{grid_size:>5} {algorithm:>9} {'skipped':>10} {after_time * 1000:>10.2f} "
+                      f"{'skipped':>11} {after_peak / 1024:>10.1f}")
+                continue
+            before_time, before_peak, before_len = measure(LEGACY_SEARCHES[algorithm], grid, start, goal)
+            if algorithm in ('BFS', 'DFS'):
+                assert before_len == after_len, f"{algorithm} path length changed on a {grid_size}x{grid_size} grid"
+            print(f"{grid_size:>5} {algorithm:>9} {before_time * 1000:>10.2f} {after_time * 1000:>10.2f} "
+                  f"{before_peak / 1024:>11.1f} {after_peak / 1024:>10.1f}")
+
+
+def compare_jps(grid_sizes=(200, 400), wall_fractions=(0.0, 0.01, 0.05), seed=0):
+    """
+    Compare A* and Jump Point Search on open maps with scattered walls,
+    player and goal in opposite corners. Both must find paths of the same cost.
+    """
+    rng = random.Random(seed)
+    print(f"{'size':>5} {'walls':>6} {'A* ms':>8} {'JPS ms':>8} {'A* expanded':>12} {'JPS expanded':>13}")
+    for grid_size in grid_sizes:
+        for wall_fraction in wall_fractions:
+            grid = GridModel(grid_size)
+            grid.search_cache = None
+            start, goal = (1, 1), (grid_size - 2, grid_size - 2)
+            grid.create_auto_map(start, goal, place_obstacles=False, monster_enabled=False)
+            for _ in range(int(grid_size * grid_size * wall_fraction)):
+                x, y = rng.randrange(grid_size), rng.randrange(grid_size)
+                if (x, y) not in (start, goal):
+                    grid.set_cell(x, y, c.WALL_ID)
+
+            astar_path, astar_time = grid.astar(start, goal)
+            astar_expanded = grid.last_search_stats['expanded']
+            jps_path, jps_time = grid.jps(start, goal)
+            jps_expanded = grid.last_search_stats['expanded']
+            assert (astar_path is None) == (jps_path is None), "A* and JPS disagree on reachability"
+            if astar_path:
+                assert grid.path_cost(astar_path) == grid.path_cost(jps_path), "JPS path is more expensive than A*"
+            print(f"{grid_size:>5} {wall_fraction:>6.0%} {astar_time * 1000:>8.2f} {jps_time * 1000:>8.2f} "
+                  f"{astar_expanded:>12} {jps_expanded:>13}")
+
+
+def compare_hpa(grid_sizes=(200, 400), maps=5, edits=20, seed=0):
+    """
+    Compare A* and HPA* on generated maps: query time, expansions and path cost,
+    plus the one-off abstraction build and the cost of a query right after an edit.
+    """
+    from experiments import derive_seeds, generate_map
+
+    rng = random.Random(seed)
+    print(f"{'size':>5} {'build ms':>9} {'A* ms':>8} {'HPA* ms':>8} {'edit+HPA* ms':>13} "
+          f"{'A* expanded':>12} {'HPA* expanded':>14} {'cost ratio':>11}")
+    for grid_size in grid_sizes:
+        for map_seed in derive_seeds(seed, maps):
+            grid, start, goal = generate_map(grid_size, map_seed)
+            grid.search_cache = None
+            astar_path, astar_time = grid.astar(start, goal)
+            if astar_path is None:
+                continue
+            astar_expanded = grid.last_search_stats['expanded']
+            build_start = time.perf_counter()
+            grid.hpa(start, goal)
+            build_time = time.perf_counter() - build_start
+            hpa_path, hpa_time = grid.hpa(start, goal)
+            hpa_expanded = grid.last_search_stats['expanded']
+            cost_ratio = grid.path_cost(hpa_path) / grid.path_cost(astar_path)
+
+            edit_time = 0
+            for _ in range(edits):
+                x, y = rng.randrange(grid_size), rng.randrange(grid_size)
+                if (x, y) not in (start, goal):
+                    grid.update_cell(x, y, rng.choice(["wall", "eraser", "mountain"]))
+                    _, query_time = grid.hpa(start, goal)
+                    edit_time += query_time / edits
+
+            print(f"{grid_size:>5} {build_time * 1000:>9.1f} {astar_time * 1000:>8.2f} {hpa_time * 1000:>8.2f} "
+                  f"{edit_time * 1000:>13.2f} {astar_expanded:>12} {hpa_expanded:>14} "
+                  f"{cost_ratio:>11.3f}")
+
+
+def compare_alt(grid_sizes=(100, 200), maps=5, queries=20, seed=0):
+    """
+    Compare A* with the Manhattan and the landmark (ALT) heuristic on random queries of generated maps,
+    plus the one-off table build and loading the saved tables of the same map.
+    """
+    import tempfile
+
+    from experiments import derive_seeds, generate_map
+    from landmarks import LandmarkTables
+
+    rng = random.Random(seed)
+    table_dir = tempfile.mkdtemp()
+    print(f"{'size':>5} {'build ms':>9} {'load ms':>8} {'A* ms':>8} {'ALT ms':>8} "
+          f"{'A* expanded':>12} {'ALT expanded':>13}")
+    for grid_size in grid_sizes:
+        for map_seed in derive_seeds(seed, maps):
+            grid, _, _ = generate_map(grid_size, map_seed)
+            grid.search_cache = None
+            tables = grid.landmark_tables = LandmarkTables(grid, table_dir=table_dir)
+            build_start = time.perf_counter()
+            tables.prepare()
+            build_time = time.perf_counter() - build_start
+            tables.clear()
+            load_start = time.perf_counter()
+            tables.prepare()
+            load_time = time.perf_counter() - load_start
+
+            cells = [(x, y) for y in range(grid_size) for x in range(grid_size)
+                     if grid.grid[y][x] in (c.EMPTY_CELL_ID, c.MOUNTAIN_ID)]
+            totals = [0, 0, 0, 0]
+            for _ in range(queries):
+                start, goal = rng.choice(cells), rng.choice(cells)
+                _, astar_time = grid.astar(start, goal)
+                astar_expanded = grid.last_search_stats['expanded']
+                _, alt_time = grid.alt(start, goal)
+                for i, value in enumerate((astar_time, alt_time, astar_expanded, grid.last_search_stats['expanded'])):
+                    totals[i] += value / queries
+            print(f"{grid_size:>5} {build_time * 1000:>9.1f} {load_time * 1000:>8.2f} {totals[0] * 1000:>8.2f} "
+                  f"{totals[1] * 1000:>8.2f} {totals[2]:>12.0f} {totals[3]:>13.0f}")
+
+
+def compare_replanning(grid_sizes=(100, 200), edits=50, seed=0):
+    """
+    Compare repairing the D* Lite path after single-cell edits with a new A* search per edit.
+    """
+    from experiments import derive_seeds, generate_map
+
+    rng = random.Random(seed)
+    print(f"{'size':>5} {'first plan ms':>14} {'A* ms':>8} {'repair ms':>10} {'A* expanded':>12} {'repair expanded':>16}")
+    for grid_size in grid_sizes:
+        grid, start, goal = generate_map(grid_size, derive_seeds(seed, 1)[0])
+        grid.search_cache = None
+        _, first_time = grid.dstar(start, goal)
+        totals = [0, 0, 0, 0]
+        for _ in range(edits):
+            x, y = rng.randrange(grid_size), rng.randrange(grid_size)
+            if (x, y) in (start, goal):
+                continue
+            grid.update_cell(x, y, rng.choice(["wall", "eraser", "mountain"]))
+            _, repair_time = grid.dstar(start, goal)
+            repair_expanded = grid.last_search_stats['expanded']
+            _, astar_time = grid.astar(start, goal)
+            for i, value in enumerate((astar_time, repair_time, grid.last_search_stats['expanded'], repair_expanded)):
+                totals[i] += value / edits
+        print(f"{grid_size:>5} {first_time * 1000:>14.2f} {totals[0] * 1000:>8.2f} {totals[1] * 1000:>10.2f} "
+              f"{totals[2]:>12.0f} {totals[3]:>16.0f}")
+
+
+def compare_batch(grid_sizes=(100, 200), queries=200, shared_goals=5, seed=0):
+    """
+    Compare GridModel.batch_paths with one A* search per query, for queries spread over
+    a few shared goals (like the analysis jobs) plus some unrelated pairs.
+    """
+    from experiments import derive_seeds, generate_map
+
+    rng = random.Random(seed)
+    print(f"{'size':>5} {'queries':>8} {'A* each ms':>11} {'batch ms':>9}")
+    for grid_size in grid_sizes:
+        grid, _, _ = generate_map(grid_size, derive_seeds(seed, 1)[0])
+        grid.search_cache = None
+        free = [(x, y) for y in range(grid_size) for x in range(grid_size)
+                if c.CELL_COSTS.get(grid.grid[y][x], 1) != float('inf')]
+        goals = rng.sample(free, shared_goals)
+        pairs = [(rng.choice(free), rng.choice(goals)) for _ in range(queries - queries // 10)]
+        pairs += [(rng.choice(free), rng.choice(free)) for _ in range(queries // 10)]
+
+        start_time = time.perf_counter()
+        results = grid.batch_paths(pairs)
+        batch_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        single_paths = [grid.astar(start, goal)[0] for start, goal in pairs]
+        single_time = time.perf_counter() - start_time
+        assert [result['path'] is None for result in results] == [path is None for path in single_paths]
+        print(f"{grid_size:>5} {len(pairs):>8} {single_time * 1000:>11.1f} {batch_time * 1000:>9.1f}")
+
+
+def compare_generation(grid_sizes=(50, 100, 200), densities=(0.3, 0.5, 0.7), maps=20, seed=0):
+    """
+    Map generation throughput, in maps per second, of the legacy rejection-sampling placement
+    and of the two generators. Kept is the share of the resampled maps that still have their
+    obstacles, i.e. a connected map was found within MAX_ATTEMPTS; repaired maps always keep them.
+    """
+    print(f"{'size':>5} {'density':>8} {'before maps/s':>14} {'resample maps/s':>16} {'kept':>6} "
+          f"{'repair maps/s':>16}")
+    for grid_size in grid_sizes:
+        start, goal = (1, 1), (grid_size - 2, grid_size - 2)
+        grid = GridModel(grid_size)
+        grid.search_cache = None
+        for density in densities:
+            rng = random.Random(seed)
+            start_time = time.perf_counter()
+            for _ in range(maps):
+                grid.create_auto_map(start, goal, place_obstacles=False, monster_enabled=False)
+                legacy_place_obstacles(grid, start, goal, density, rng)
+                grid.array.refresh_costs()
+            before = maps / (time.perf_counter() - start_time)
+
+            throughput = {}
+            kept = 0
+            for generator in ("resample", "repair"):
+                rng = random.Random(seed)
+                start_time = time.perf_counter()
+                for _ in range(maps):
+                    grid.create_auto_map(start, goal, monster_enabled=False, rng=rng, density=density,
+                                         generator=generator)
+                    if generator == "resample":
+                        kept += any(grid.array.cells.count(cell_id) for cell_id in c.OBSTACLE_TYPES)
+                throughput[generator] = maps / (time.perf_counter() - start_time)
+            print(f"{grid_size:>5} {density:>8.0%} {before:>14.1f} {throughput['resample']:>16.1f} "
+                  f"{kept / maps:>6.0%} {throughput['repair']:>16.1f}")
+
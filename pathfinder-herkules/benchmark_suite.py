@@ -0,0 +1,307 @@
+"""
+Reproducible benchmark suite.
+
+The suite times the searches on fixed corpora of auto-generated maps, one per
+(grid size, obstacle density). The maps come from BENCH_SEED, so every run
+sees the same maps, and the fingerprint of each map goes into the report to
+prove it. Each search gets warm-up runs and then repeated timed runs, reported
+as median and p95. One more run under tracemalloc gives the peak memory.
+
+The report is plain JSON. Pass a stored report as the baseline to list the
+regressions: timings or memory worse than the baseline by more than
+BENCH_TOLERANCE (and timings by more than BENCH_NOISE_MS), and searches whose expansions or path lengths changed, since
+those are deterministic on a fixed corpus.
+
+    python benchmark_suite.py suite --sizes 20 100 --output report.json   (suite is the default command)
+    python benchmark_suite.py suite --save-baseline
+    python benchmark_suite.py suite --baseline benchmark_baseline.json
+
+The other commands run the before / after comparisons of benchmark.py, e.g.
+A* against jump point search on open maps:
+
+    python benchmark_suite.py jps [--sizes N ...]
+    python benchmark_suite.py reconstruction [--sizes N ...] [--obstacles]
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import benchmark
+import custom_constants as c
+from experiments import random_internal_position
+from grid_model import GridModel
+from local_search import LocalSearch
+
+
+def grid_search(method_name: str) -> Callable:
+    """
+    :return: search(grid, start, goal) -> (path, expansions) running the GridModel method
+    """
+    def search(grid, start, goal):
+        path, _ = getattr(grid, method_name)(start, goal)
+        return path, grid.last_search_stats['expanded']
+    return search
+
+
+def local_search(grid, start, goal):
+    """
+    LocalSearch as run by the local search tests. Its work is the steps it took.
+    """
+    path = LocalSearch(grid).local_search_with_restarts(start, goal, restarts=5)
+    return path, len(path) if path else 0
+
+
+# Label -> search(grid, start, goal) returning (path or None, expansions)
+SUITE_ALGORITHMS: Dict[str, Callable] = {
+    'BFS': grid_search('bfs'),
+    'DFS': grid_search('dfs'),
+    'UCS': grid_search('ucs'),
+    'A*': grid_search('astar'),
+    'LocalSearch': local_search,
+}
+# Measurements compared against the baseline: the timings and memory within the tolerance, the rest exactly
+TIMED_FIELDS = ('median_ms', 'p95_ms', 'peak_kib')
+EXACT_FIELDS = ('expanded', 'path_length')
+# Command -> comparison of benchmark.py it runs and its help
+COMPARISONS: Dict[str, Tuple[Callable, str]] = {
+    'reconstruction': (benchmark.compare_path_reconstruction, "legacy path-copying searches vs the search core"),
+    'jps': (benchmark.compare_jps, "A* vs jump point search on open maps"),
+    'hpa': (benchmark.compare_hpa, "A* vs HPA*, with the abstraction build and repair"),
+    'alt': (benchmark.compare_alt, "A* with the Manhattan vs the landmark (ALT) heuristic"),
+    'replan': (benchmark.compare_replanning, "D* Lite repairs vs a new A* search per edit"),
+    'batch': (benchmark.compare_batch, "batch_paths vs one A* search per query"),
+    'generate': (benchmark.compare_generation, "map generation throughput"),
+}
+COMMANDS = ('suite',) + tuple(COMPARISONS)
+
+
+def corpus_rng(seed: int, grid_size: int, density: float) -> random.Random:
+    """
+    :return: generator of one corpus. Seeded from a string, so a corpus stays
+             the same when sizes or densities are added to the suite.
+    """
+    return random.Random(f"{seed}:{grid_size}:{density}")
+
+
+def build_corpus(grid_size: int, density: float, maps: int = c.BENCH_MAPS,
+                 seed: int = c.BENCH_SEED) -> List[Tuple[GridModel, Tuple[int, int], Tuple[int, int]]]:
+    """
+    Generate the maps of one (size, density) corpus, without hydras so that every map is solvable.
+    :return: (grid, player position, goal position) per map
+    """
+    rng = corpus_rng(seed, grid_size, density)
+    corpus = []
+    for _ in range(maps):
+        player_pos = random_internal_position(grid_size, rng)
+        goal_pos = random_internal_position(grid_size, rng)
+        while goal_pos == player_pos:
+            goal_pos = random_internal_position(grid_size, rng)
+        grid = GridModel(grid_size)
+        grid.search_cache = None  # Repeated searches must run, not hit the cache
+        grid.create_auto_map(player_pos, goal_pos, place_obstacles=True, monster_enabled=False,
+                             rng=rng, density=density)
+        corpus.append((grid, player_pos, goal_pos))
+    return corpus
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """
+    :return: nearest-rank percentile of the values, e.g. fraction=0.95 for p95
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure_corpus(search: Callable, corpus, warmups: int = c.BENCH_WARMUPS,
+                   repeats: int = c.BENCH_REPEATS) -> Dict:
+    """
+    Time one search on every map of a corpus.
+    :return: median / p95 / mean runtime over all timed runs, the largest traced peak,
+             and the expansions and path lengths summed over the maps
+    """
+    runtimes = []
+    peak = 0
+    expanded = 0
+    path_length = 0
+    found = 0
+    for grid, start, goal in corpus:
+        for _ in range(warmups):
+            search(grid, start, goal)
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            path, expansions = search(grid, start, goal)
+            runtimes.append(time.perf_counter() - start_time)
+
+        tracemalloc.start()
+        search(grid, start, goal)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        expanded += expansions
+        path_length += len(path) if path else 0
+        found += path is not None
+
+    return {
+        "runs": len(runtimes),
+        "median_ms": statistics.median(runtimes) * 1000,
+        "p95_ms": percentile(runtimes, 0.95) * 1000,
+        "mean_ms": statistics.fmean(runtimes) * 1000,
+        "peak_kib": peak / 1024,
+        "expanded": expanded,
+        "path_length": path_length,
+        "found": found,
+    }
+
+
+def run_suite(sizes: Sequence[int] = c.BENCH_SIZES,
+              densities: Sequence[float] = c.BENCH_DENSITIES,
+              algorithms: Sequence[str] = tuple(SUITE_ALGORITHMS),
+              maps: int = c.BENCH_MAPS,
+              warmups: int = c.BENCH_WARMUPS,
+              repeats: int = c.BENCH_REPEATS,
+              seed: int = c.BENCH_SEED) -> Dict:
+    """
+    Benchmark every algorithm on every corpus.
+    :return: JSON-serialisable report: "meta" (settings and machine), "corpora" (map fingerprints)
+             and "results", keyed "<algorithm>/<size>/<density>"
+    """
+    report = {
+        "meta": {
+            "seed": seed, "maps": maps, "warmups": warmups, "repeats": repeats,
+            "sizes": list(sizes), "densities": list(densities), "algorithms": list(algorithms),
+            "python": platform.python_version(), "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "corpora": {},
+        "results": {},
+    }
+    for grid_size in sizes:
+        for density in densities:
+            corpus = build_corpus(grid_size, density, maps, seed)
+            report["corpora"][f"{grid_size}/{density}"] = [f"{grid.array.fingerprint:016x}" for grid, _, _ in corpus]
+            for algorithm in algorithms:
+                result = measure_corpus(SUITE_ALGORITHMS[algorithm], corpus, warmups, repeats)
+                result.update(algorithm=algorithm, grid_size=grid_size, density=density)
+                report["results"][f"{algorithm}/{grid_size}/{density}"] = result
+                print(f"{algorithm:>12} {grid_size:>5} {density:>5}: median {result['median_ms']:9.2f} ms, "
+                      f"p95 {result['p95_ms']:9.2f} ms, peak {result['peak_kib']:9.1f} KiB, "
+                      f"expanded {result['expanded']}")
+    return report
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float = c.BENCH_TOLERANCE) -> List[str]:
+    """
+    :return: one line per regression of the report against the baseline. Only entries present
+             in both are compared, and results on corpora that differ from the baseline's are skipped.
+    """
+    regressions = []
+    for corpus, fingerprints in report["corpora"].items():
+        if corpus in baseline["corpora"] and baseline["corpora"][corpus] != fingerprints:
+            regressions.append(f"corpus {corpus}: maps differ from the baseline, results not compared")
+
+    for key, result in report["results"].items():
+        before = baseline["results"].get(key)
+        corpus = f"{result['grid_size']}/{result['density']}"
+        if before is None or baseline["corpora"].get(corpus) != report["corpora"][corpus]:
+            continue
+        for field in TIMED_FIELDS:
+            noise = c.BENCH_NOISE_MS if field.endswith('_ms') else 0
+            if result[field] > before[field] * (1 + tolerance) and result[field] - before[field] > noise:
+                regressions.append(f"{key} {field}: {before[field]:.2f} -> {result[field]:.2f} "
+                                   f"(+{result[field] / before[field] - 1:.0%})")
+        for field in EXACT_FIELDS:
+            if result[field] != before[field]:
+                regressions.append(f"{key} {field}: {before[field]} -> {result[field]}")
+    return regressions
+
+
+def load_report(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_report(report: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def suite(args: argparse.Namespace) -> None:
+    suite_report = run_suite(args.sizes, args.densities, args.algorithms, args.maps, args.warmups, args.repeats,
+                             args.seed)
+    if args.output:
+        save_report(suite_report, args.output)
+    if args.save_baseline:
+        save_report(suite_report, c.BENCH_BASELINE_FILE)
+        print(f"Baseline saved to {c.BENCH_BASELINE_FILE}")
+    if args.baseline:
+        baseline_report = load_report(args.baseline)
+        if baseline_report is None:
+            sys.exit(f"No baseline at {args.baseline}")
+        found_regressions = compare_reports(suite_report, baseline_report, args.tolerance)
+        for line in found_regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(found_regressions)} regression(s) against {args.baseline}")
+        sys.exit(1 if found_regressions else 0)
+
+
+def comparison(args: argparse.Namespace) -> None:
+    compare, _ = COMPARISONS[args.command]
+    options = {} if args.sizes is None else {"grid_sizes": tuple(args.sizes)}
+    if args.command == 'reconstruction':
+        options["place_obstacles"] = args.obstacles
+    compare(**options)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the searches on fixed seeded map corpora.")
+    commands = parser.add_subparsers(dest="command", metavar="{" + ",".join(COMMANDS) + "}")
+
+    command = commands.add_parser("suite", help="time the searches on the corpora, against a baseline (default)")
+    command.add_argument("--sizes", type=int, nargs="+", default=c.BENCH_SIZES)
+    command.add_argument("--densities", type=float, nargs="+", default=c.BENCH_DENSITIES)
+    command.add_argument("--algorithms", nargs="+", default=list(SUITE_ALGORITHMS), choices=list(SUITE_ALGORITHMS))
+    command.add_argument("--maps", type=int, default=c.BENCH_MAPS)
+    command.add_argument("--warmups", type=int, default=c.BENCH_WARMUPS)
+    command.add_argument("--repeats", type=int, default=c.BENCH_REPEATS)
+    command.add_argument("--seed", type=int, default=c.BENCH_SEED)
+    command.add_argument("--output", help="write the report to this JSON file")
+    command.add_argument("--baseline", help="compare against this report and exit with 1 on a regression")
+    command.add_argument("--tolerance", type=float, default=c.BENCH_TOLERANCE)
+    command.add_argument("--save-baseline", action="store_true", help=f"store the report as {c.BENCH_BASELINE_FILE}")
+    command.set_defaults(run=suite)
+
+    for name, (_, description) in COMPARISONS.items():
+        command = commands.add_parser(name, help=description)
+        command.add_argument("--sizes", type=int, nargs="+", help="side lengths of the maps")
+        if name == 'reconstruction':
+            command.add_argument("--obstacles", action="store_true", help="generated maps instead of open ones")
+        command.set_defaults(run=comparison)
+    return parser
+
+
+def legacy_arguments(argv: List[str]) -> List[str]:
+    """
+    Run the suite when no command is given, as the command line did before the comparisons were added.
+    """
+    if argv and (argv[0] in COMMANDS or argv[0] in ("-h", "--help")):
+        return argv
+    return ["suite"] + argv
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(legacy_arguments(sys.argv[1:] if argv is None else argv))
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
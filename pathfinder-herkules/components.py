@@ -0,0 +1,134 @@
+"""
+Connected-component index of the passable cells.
+
+Every cell the weighted searches can enter carries the label of its
+4-connected component, so "can start reach goal" is a comparison of two
+labels. The labels come from GridArray.component_labels and are then patched
+on every cell edit instead of being recomputed:
+
+- a cell that opens up joins the components around it: their labels are
+  merged with a union-find over labels, so no cell has to be relabeled;
+- a cell that gets blocked can only split its component if its open
+  neighbours do not lie on one unbroken arc of the 8 cells around it. When
+  the local test can't rule a split out, the labels are recomputed on the
+  next query.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import custom_constants as c
+from grid_array import PASSABLE
+
+
+def ring_keeps_connected(ring: List[bool]) -> bool:
+    """
+    Local connectivity test for a cell that gets blocked.
+    :param ring: openness of the 8 cells around it, in NEIGHBOUR_RING order (odd positions are the 4-neighbours)
+    :return: True if all of its open 4-neighbours lie on one arc of open ring cells,
+             so any route through the cell can go around it along that arc
+    """
+    if all(ring):
+        return True
+
+    # Walk the ring once, starting after a closed cell, and count the arcs
+    # of open cells that contain a 4-neighbour (the odd ring positions)
+    start = ring.index(False)
+    arcs_with_neighbour = 0
+    arc_has_neighbour = False
+    for step in range(1, len(ring) + 1):
+        i = (start + step) % len(ring)
+        if ring[i]:
+            arc_has_neighbour = arc_has_neighbour or i % 2 == 1
+        else:
+            arcs_with_neighbour += arc_has_neighbour
+            arc_has_neighbour = False
+    return arcs_with_neighbour <= 1
+
+
+class ComponentIndex:
+    """
+    Component label of every passable cell of a GridModel, kept up to date through its cell listeners.
+    """
+
+    def __init__(self, grid_model):
+        """
+        :param grid_model: GridModel to index
+        """
+        self.array = grid_model.array
+        self.labels = None  # Label per flat index, 0 for blocked cells. None = recompute on the next query
+        self.merged: Dict[int, int] = {}  # Label -> label its component was merged into
+        self.next_label = 1
+        self.rebuilds = 0  # Full labeling passes so far
+        width = self.array.width
+        self.ring_offsets = [dx + dy * width for dx, dy in c.NEIGHBOUR_RING]
+        grid_model.add_cell_listener(self.cells_changed)
+
+    def rebuild(self) -> None:
+        self.labels = self.array.component_labels()
+        self.merged = {}
+        self.next_label = max(self.labels) + 1
+        self.rebuilds += 1
+
+    def _root(self, label: int) -> int:
+        merged = self.merged
+        while label in merged:
+            parent = merged[label]
+            if parent in merged:
+                merged[label] = merged[parent]  # Path halving
+            label = merged[label]
+        return label
+
+    def component(self, index: int) -> int:
+        """
+        :return: component of the flat index, 0 if the cell is blocked
+        """
+        if self.labels is None:
+            self.rebuild()
+        label = self.labels[index]
+        return self._root(label) if label else 0
+
+    def connected(self, start: Tuple[int, int], goal: Tuple[int, int]) -> bool:
+        """
+        :return: True if a weighted search can get from start to goal. Like the searches,
+                 the start cell itself does not have to be passable, only the cells after it.
+        """
+        start_index, goal_index = self.array.index(*start), self.array.index(*goal)
+        if start_index == goal_index:
+            return True
+        goal_component = self.component(goal_index)
+        if not goal_component:
+            return False
+        return any(self.component(start_index + offset) == goal_component
+                   for offset in (0,) + self.array.offsets)
+
+    def cells_changed(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """
+        Cell listener: patch the labels of the changed cells.
+        :param cells: changed (x, y) cells, None if the whole map changed
+        """
+        if self.labels is None:
+            return
+        if cells is None:
+            self.labels = None
+            return
+
+        labels, offsets = self.labels, self.array.offsets
+        for x, y in cells:
+            index = self.array.index(x, y)
+            was_passable = labels[index] != 0
+            if PASSABLE[self.array.cells[index]] == was_passable:
+                continue  # Cost change only, the graph stays the same
+            if was_passable:
+                labels[index] = 0
+                if not ring_keeps_connected([labels[index + offset] != 0 for offset in self.ring_offsets]):
+                    self.labels = None
+                    return
+            else:
+                roots = {self._root(labels[index + offset]) for offset in offsets if labels[index + offset]}
+                if roots:
+                    root = roots.pop()
+                    for other in roots:
+                        self.merged[other] = root
+                else:
+                    root = self.next_label
+                    self.next_label += 1
+                labels[index] = root
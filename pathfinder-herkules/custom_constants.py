@@ -10,6 +10,12 @@ SIDEBAR_WIDTH = 140
 PYGAME_FONT = 27
 GRID_WIDTH = 1
 RESULT_FONT_SIZE = 20
+STATS_FONT_SIZE = 16  # Search stats of the displayed path in the sidebar
+
+FPS = 60  # Frame rate cap while the map is being drawn on
+IDLE_WAIT_MS = 1000  # When idle, block on events for up to this long before redrawing
+TEXT_CACHE_SIZE = 256  # Rendered labels kept by the sidebar
+NUMPY_MIN_CELLS = 10000  # Grids with this many cells or more refresh their costs with numpy (imported on first use)
 
 EMPTY_CELL_ID = 0
 WALL_ID = 1
@@ -33,6 +39,17 @@ CELL_COSTS = {
     DEAD_HIDRA_ID: 1
 }
 
+# IMAGES _________________________________
+
+SPRITE_PATHS = {
+    WALL_ID: "./images/wall.jpeg",
+    PLAYER_ID: "./images/hercules.jpeg",
+    WIFEY_ID: "./images/wifey.jpeg",
+    LAVA_ID: "./images/lava.jpg",
+    MOUNTAIN_ID: "./images/mountain.jpg",
+    HIDRA_ID: "./images/hidra.jpg",
+}
+
 # COLORS _________________________________
 
 LIGHT_GREY = (200, 200, 200)
@@ -55,14 +72,70 @@ BUTTON_X = WINDOW_SIZE + 10
 BUTTON_TEXT_X = WINDOW_SIZE + 20
 
 BUTTON_LABELS = ["Wall", "Eraser", "Player", "Wifey", "Lava", "Mountain"]
-BUTTON_SPACING = 20  # Spacing between buttons
+BUTTON_SPACING = 10  # Spacing between buttons
 SIDEBAR_PADDING = 10  # Padding from top and bottom of the sidebar
 
 MAP_CHECK_Y = WINDOW_SIZE - 160
 RUN_BUTTON_Y = WINDOW_SIZE - 80
+FRAME_TIME_Y = WINDOW_SIZE - 25
+
+# MAP VALIDATION _________________________
+
+# The 8 cells around a cell, in order around the ring, so consecutive entries touch
+NEIGHBOUR_RING = [(-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)]
+
+# HIERARCHICAL SEARCH ______________________
+
+HPA_CLUSTER_SIZE = 10  # Side length of an HPA* cluster in cells
+HPA_ENTRANCE_WIDTH = 6  # Longest piece of an entrance that gets a single transition
+
+# LANDMARK (ALT) HEURISTIC _________________
+
+ALT_LANDMARKS = 8  # Landmarks whose distance tables are precomputed per map
+ALT_ACTIVE_LANDMARKS = 4  # Landmarks a query uses: the ones with the best bound at its start
+ALT_TABLE_DIR = None  # Directory the tables are saved to / loaded from per map, None keeps them in memory only
 
 # CREATING A DEFAULT MAP ___________________
 
 MAX_ATTEMPTS = 20 # Attempt to place obstacles while ensuring a path exists
+OBSTACLE_DENSITY = 0.5  # Fraction of the internal cells turned into obstacles
+OBSTACLE_TYPES = [LAVA_ID, MOUNTAIN_ID]  # Drawn uniformly for every obstacle
+# "resample": place obstacles anywhere and retry up to MAX_ATTEMPTS times until the goal is reachable
+# "repair": place obstacles anywhere and, if the goal is unreachable, flip the fewest lava cells to mountains
+MAP_GENERATOR = "resample"
+
+MAP_FILE = "map.hmap"  # Map file the S / O keys save to and load from, see map_io
+
+# SEARCH CACHE _____________________________
+
+SEARCH_CACHE_SIZE = 256  # Search results kept, 0 disables the cache
+SEARCH_CACHE_POLICY = "lru"  # "lru" or "fifo"
+
+# BENCHMARK SUITE __________________________
+
+BENCH_SIZES = (20, 100, 500, 1000)  # Side lengths of the benchmark corpora
+BENCH_DENSITIES = (0.2, 0.35, 0.5)  # Obstacle densities of the benchmark corpora
+BENCH_MAPS = 3  # Maps per (size, density)
+BENCH_WARMUPS = 1  # Untimed runs per map before timing
+BENCH_REPEATS = 5  # Timed runs per map
+BENCH_SEED = 0  # Corpora are generated from this seed, so every run benchmarks the same maps
+BENCH_TOLERANCE = 0.25  # Slowdown (or memory growth) over the baseline reported as a regression
+BENCH_NOISE_MS = 1.0  # Timing differences below this are noise, whatever the relative change
+BENCH_BASELINE_FILE = "benchmark_baseline.json"
+
+# EXPERIMENTS ______________________________
+
+EXPERIMENT_SEED = 0  # Base seed, every map's seed is derived from it
+EXPERIMENT_WORKERS = None  # Worker processes, None = one per CPU
+RESULTS_FLUSH_EVERY = 1000  # Rows buffered before they are written to the results file
+
+# RESULTS ANALYSIS _________________________
+
+ANALYSIS_CHUNK_ROWS = 100000  # Result rows read and aggregated at a time
+# Runtimes are counted on log-spaced bins between these bounds (seconds) to get the median and p95
+# without keeping the runtimes: 200 bins per decade puts every quantile within ~1.2% of the exact one
+ANALYSIS_MIN_RUNTIME = 1e-7
+ANALYSIS_MAX_RUNTIME = 1e4
+ANALYSIS_BINS_PER_DECADE = 200
 
 # ________________________________________
@@ -0,0 +1,222 @@
+"""
+Incremental replanning with D* Lite.
+
+D* Lite searches backwards from the goal: g[s] is the cost of the cheapest
+known path from s to the goal and rhs[s] the one-step lookahead
+min(cost of entering s' + g[s']) over the neighbours s' of s. A cell is
+consistent when both agree. After cells change cost only the cells whose
+lookahead changed become inconsistent, and the planner re-expands just those,
+in order of their key, until the start is consistent again. The g / rhs
+state is kept between calls, so repairing the path after a painted wall or a
+killed hydra costs a fraction of a new search.
+
+The planner listens to the cell edits of its GridModel and applies them the
+next time a path is asked for. Walls, lava and hydras are not part of the
+graph: their g and rhs stay infinite until they are cleared.
+"""
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from grid_array import INF
+from search_core import manhattan_heuristic, record_stats
+
+
+class DStarLite:
+    """
+    Shortest paths to one goal, repaired after every change of the map or of the start.
+    """
+
+    def __init__(self, grid_model, start: Tuple[int, int], goal: Tuple[int, int]):
+        """
+        :param grid_model: GridModel to plan on
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        """
+        self.grid_model = grid_model
+        self.array = grid_model.array
+        self.goal = goal
+        self.goal_index = self.array.index(*goal)
+        self.start = start
+        self.start_index = self.array.index(*start)
+        # Work counters of the last replan
+        self.expanded = 0
+        self.generated = 0
+        self.peak_frontier = 0
+        self.expanded_cells = set()  # To count the cells a replan expands more than once
+        self.pending_cells = []
+        self.reset()
+        grid_model.add_cell_listener(self.cells_changed)
+
+    def reset(self) -> None:
+        """
+        Forget everything: the next replan is a full search.
+        """
+        size = len(self.array.costs)
+        self.g = array('d', [INF]) * size
+        self.rhs = array('d', [INF]) * size
+        self.km = 0  # Added to every key when the start moves, instead of re-keying the queue
+        self.heap = []
+        self.queued: Dict[int, Tuple[float, float]] = {}  # Cell -> key of its live heap entry
+        self.h = manhattan_heuristic(self.array, self.array.coords(self.start_index))
+        self.rhs[self.goal_index] = 0
+        self.reached = 1  # Cells with a finite rhs
+        self._push(self.goal_index)
+        self.pending_cells = []
+
+    # Priority queue _____________________
+
+    def _key(self, index: int) -> Tuple[float, float]:
+        best = min(self.g[index], self.rhs[index])
+        return best + self.h(index) + self.km, best
+
+    def _push(self, index: int) -> None:
+        key = self._key(index)
+        self.queued[index] = key
+        heapq.heappush(self.heap, (key, index))
+        self.generated += 1
+
+    def _top(self) -> Tuple[Tuple[float, float], int]:
+        """
+        :return: smallest live (key, cell) of the queue, ((inf, inf), -1) if it is empty
+        """
+        heap = self.heap
+        while heap:
+            key, index = heap[0]
+            if self.queued.get(index) == key:
+                return key, index
+            heapq.heappop(heap)  # Entry was removed or re-keyed since it was pushed
+        return (INF, INF), -1
+
+    # D* Lite ____________________________
+
+    def _lookahead(self, index: int) -> float:
+        """
+        :return: rhs of a cell, the cheapest step to a neighbour plus its cost to the goal
+        """
+        if index == self.goal_index:
+            return 0
+        costs = self.array.costs
+        g = self.g
+        return min(costs[index + offset] + g[index + offset] for offset in self.array.offsets)
+
+    def _update_cell(self, index: int) -> None:
+        """
+        Recompute rhs of a cell and (re)queue it if it became inconsistent.
+        """
+        was_reached = self.rhs[index] != INF
+        if self.array.costs[index] == INF and index != self.start_index:
+            # Blocked cells are not part of the graph
+            self.g[index] = self.rhs[index] = INF
+            self.reached -= was_reached
+            self.queued.pop(index, None)
+            return
+        self.rhs[index] = self._lookahead(index)
+        self.reached += (self.rhs[index] != INF) - was_reached
+        if self.g[index] != self.rhs[index]:
+            self._push(index)
+        else:
+            self.queued.pop(index, None)
+
+    def _compute_shortest_path(self) -> None:
+        g, rhs, offsets = self.g, self.rhs, self.array.offsets
+        start_index = self.start_index
+        while True:
+            key, index = self._top()
+            if index == -1 or (key >= self._key(start_index) and rhs[start_index] == g[start_index]):
+                return
+            new_key = self._key(index)
+            if key < new_key:
+                self._push(index)  # Stale priority: the start moved since it was queued
+                continue
+            del self.queued[index]
+            self.expanded += 1
+            self.expanded_cells.add(index)
+            if g[index] > rhs[index]:
+                # Overconsistent: the cell got cheaper, pass the improvement on to its neighbours
+                g[index] = rhs[index]
+                for offset in offsets:
+                    self._update_cell(index + offset)
+                self.peak_frontier = max(self.peak_frontier, len(self.heap))
+            else:
+                # Underconsistent: the cell got more expensive, raise it and let it settle again
+                g[index] = INF
+                self._update_cell(index)
+                for offset in offsets:
+                    self._update_cell(index + offset)
+                self.peak_frontier = max(self.peak_frontier, len(self.heap))
+
+    # Public interface ___________________
+
+    def cells_changed(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """
+        Cell listener: remember which cells changed until the next replan.
+        :param cells: changed (x, y) cells, None if the whole map changed
+        """
+        if cells is None or self.pending_cells is None:
+            self.pending_cells = None
+        else:
+            self.pending_cells.extend(cells)
+
+    def move_start(self, start: Tuple[int, int]) -> None:
+        """
+        Plan from another start cell, reusing everything computed so far.
+        """
+        if start == self.start:
+            return
+        new_index = self.array.index(*start)
+        self.km += self.h(new_index)  # Distance from the old start to the new one
+        self.start, self.start_index = start, new_index
+        self.h = manhattan_heuristic(self.array, start)
+
+    def replan(self, stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Apply the cell changes since the last call and repair the path.
+        :param stats: optional dict that receives the work counters of this replan, see search_core.STAT_FIELDS.
+                      Visited counts the cells the planner holds a cost for, kept between replans.
+        :return: path start -> goal, None if the goal is unreachable
+        """
+        self.expanded = self.generated = 0
+        self.expanded_cells = set()
+        if self.pending_cells is None:
+            self.reset()
+        else:
+            offsets = self.array.offsets
+            for x, y in self.pending_cells:
+                # Entering the cell costs something else now, which changes the lookahead
+                # of every neighbour, and the cell itself may have joined or left the graph
+                index = self.array.index(x, y)
+                self._update_cell(index)
+                for offset in offsets:
+                    neighbour = index + offset
+                    if self.array.costs[neighbour] != INF or neighbour == self.start_index:
+                        self._update_cell(neighbour)
+            self.pending_cells = []
+        self.peak_frontier = len(self.heap)
+        self._compute_shortest_path()
+        if stats is not None:
+            record_stats(stats, self.expanded, self.generated, self.peak_frontier, self.reached,
+                         self.expanded - len(self.expanded_cells))
+        return self.path()
+
+    def cost_to_goal(self) -> float:
+        """
+        :return: cost of the current path from the start, inf if there is none
+        """
+        return self.g[self.start_index]
+
+    def path(self) -> Optional[List[Tuple[int, int]]]:
+        """
+        Follow the cheapest neighbour from the start to the goal.
+        """
+        if self.g[self.start_index] == INF:
+            return None
+        costs, g, offsets = self.array.costs, self.g, self.array.offsets
+        index = self.start_index
+        path = [index]
+        while index != self.goal_index:
+            index = min((index + offset for offset in offsets), key=lambda cell: costs[cell] + g[cell])
+            path.append(index)
+            if len(path) > len(costs):
+                return None  # Only possible if the state was left inconsistent
+        return self.array.path_to_coords(path)
@@ -0,0 +1,190 @@
+"""
+Parallel experiment engine.
+
+Map seeds are derived from one base seed and sharded across a process pool.
+Each worker generates its maps with its own seeded random.Random and runs all
+the searches on them, and the parent writes the rows back in run order. The
+maps, and therefore every non-timing column, are the same whatever the
+number of workers.
+
+The maps can also come from a corpus file (see map_io): the workers then get
+record offsets instead of seeds and read their maps from the memory-mapped
+file themselves.
+"""
+import os
+import random
+from typing import List, Optional, Tuple
+
+import custom_constants as c
+from grid_model import GridModel
+from map_io import MapFile, write_corpus
+from results_sink import ResultsSink
+
+ALGORITHMS = ['BFS', 'DFS', 'UCS', 'A*', 'JPS', 'Bi-BFS', 'Bi-A*']
+ALGORITHM_METHOD_MAPPING = {
+    'BFS': 'bfs',
+    'DFS': 'dfs',
+    'UCS': 'ucs',
+    'A*': 'astar',
+    'JPS': 'jps',
+    'Bi-BFS': 'bidirectional_bfs',
+    'Bi-A*': 'bidirectional_astar'
+}
+# Search stats stored in the results after runtime and expansions, see results_sink.RESULT_COLUMNS
+EXTRA_STAT_FIELDS = ('generated', 'peak_frontier', 'peak_visited', 'reopened')
+
+
+def derive_seeds(base_seed: int, count: int) -> List[int]:
+    """
+    :return: `count` per-run seeds, always the same for the same base seed
+    """
+    seed_rng = random.Random(base_seed)
+    return [seed_rng.getrandbits(32) for _ in range(count)]
+
+
+def random_internal_position(grid_size: int, rng: random.Random) -> Tuple[int, int]:
+    return rng.randint(1, grid_size - 2), rng.randint(1, grid_size - 2)
+
+
+def generate_map(grid_size: int, seed: int,
+                 density: float = c.OBSTACLE_DENSITY) -> Tuple[GridModel, Tuple[int, int], Tuple[int, int]]:
+    """
+    Build the auto-generated map for a seed.
+    :param density: fraction of the internal cells turned into obstacles
+    :return: grid, player position, goal position
+    """
+    rng = random.Random(seed)
+    player_pos = random_internal_position(grid_size, rng)
+    goal_pos = random_internal_position(grid_size, rng)
+    while goal_pos == player_pos:
+        goal_pos = random_internal_position(grid_size, rng)
+
+    grid = GridModel(grid_size)
+    grid.create_auto_map(player_pos, goal_pos, place_obstacles=True, rng=rng, density=density)
+    return grid, player_pos, goal_pos
+
+
+def obstacle_density(grid: GridModel) -> float:
+    """
+    :return: fraction of the internal cells holding an obstacle, the density of a map of unknown origin
+    """
+    internal_cells = (grid.grid_size - 2) ** 2
+    obstacles = sum(grid.array.cells.count(bytes([cell_id])) for cell_id in c.OBSTACLE_TYPES)
+    return obstacles / internal_cells if internal_cells > 0 else 0.0
+
+
+def search_map(run_number: int, seed: Optional[int], density: float, grid: GridModel,
+               player_pos: Tuple[int, int], goal_pos: Tuple[int, int]) -> List[Tuple]:
+    """
+    Time every algorithm on one map, recording the work counters of each search.
+    :return: one results row per algorithm (see results_sink.RESULT_COLUMNS), none if the map isn't valid
+    """
+    if not grid.valid_map:
+        return []
+
+    rows = []
+    for algorithm in ALGORITHMS:
+        search_method = getattr(grid, ALGORITHM_METHOD_MAPPING[algorithm])
+        _, runtime = search_method(player_pos, goal_pos)
+        stats = grid.last_search_stats
+        rows.append((run_number, -1 if seed is None else seed, grid.grid_size, density, algorithm, runtime,
+                     stats['expanded'], stats['path_cost'], stats['path_steps'], *(stats[field] for field in EXTRA_STAT_FIELDS)))
+    return rows
+
+
+def run_map(run_number: int, seed: int, grid_size: int, density: float = c.OBSTACLE_DENSITY) -> List[Tuple]:
+    """
+    Generate one map and time every algorithm on it.
+    :return: results rows, none if the generated map isn't valid
+    """
+    grid, player_pos, goal_pos = generate_map(grid_size, seed, density)
+    return search_map(run_number, seed, density, grid, player_pos, goal_pos)
+
+
+def run_shard(shard: List[Tuple[int, int]], grid_size: int, density: float = c.OBSTACLE_DENSITY) -> List[Tuple]:
+    """
+    Worker entry point: run every (run_number, seed) of a shard.
+    :return: rows of the valid maps, in shard order
+    """
+    rows = []
+    for run_number, seed in shard:
+        rows.extend(run_map(run_number, seed, grid_size, density))
+    return rows
+
+
+def run_corpus_shard(shard: List[Tuple[int, int]], corpus_file: str) -> List[Tuple]:
+    """
+    Worker entry point: run every (run_number, record offset) of a shard of a corpus file.
+    Each worker maps the file itself, so only the offsets are sent to it.
+    The density of a corpus map is measured, as the file doesn't say how it was made.
+    :return: rows of the valid maps, in shard order
+    """
+    rows = []
+    with MapFile(corpus_file) as corpus:
+        for run_number, offset in shard:
+            record = corpus.record(offset)
+            grid = record.to_grid_model()
+            rows.extend(search_map(run_number, record.seed, obstacle_density(grid), grid,
+                                   record.player_pos, record.goal_pos))
+    return rows
+
+
+def generate_corpus(corpus_file: str, runs: int = 100, grid_size: int = c.GRID_SIZE,
+                    seed: int = c.EXPERIMENT_SEED, density: float = c.OBSTACLE_DENSITY) -> int:
+    """
+    Write the maps run_experiments would generate to a corpus file, one at a time.
+    :return: maps written
+    """
+    maps = ((generate_map(grid_size, map_seed, density)[0], map_seed) for map_seed in derive_seeds(seed, runs))
+    return write_corpus(corpus_file, maps)
+
+
+def run_experiments(runs: int = 100,
+                    grid_size: int = c.GRID_SIZE,
+                    results_file: str = "results.csv",
+                    workers: Optional[int] = c.EXPERIMENT_WORKERS,
+                    seed: int = c.EXPERIMENT_SEED,
+                    shard_size: Optional[int] = None,
+                    flush_every: int = c.RESULTS_FLUSH_EVERY,
+                    corpus_file: Optional[str] = None,
+                    density: float = c.OBSTACLE_DENSITY) -> None:
+    """
+    Generate `runs` maps, run all the searches on each one and save the runtimes and search stats.
+    :param runs: number of maps, ignored with a corpus
+    :param grid_size: side length of every map, ignored with a corpus
+    :param results_file: results file to write, .csv, .npz or .parquet (see results_sink)
+    :param workers: worker processes, None = one per CPU, 1 = run in this process
+    :param seed: base seed the per-map seeds are derived from
+    :param shard_size: maps per task sent to a worker, defaults to an even split in 4 tasks per worker
+    :param flush_every: rows buffered before they are written out
+    :param corpus_file: run on the maps of this corpus file (see map_io) instead of generating them
+    :param density: obstacle density of the generated maps, ignored with a corpus
+    :return: None
+    """
+    if corpus_file is None:
+        jobs = list(enumerate(derive_seeds(seed, runs), start=1))
+        worker, worker_arguments = run_shard, (grid_size, density)
+    else:
+        with MapFile(corpus_file) as corpus:
+            jobs = list(enumerate(corpus.offsets(), start=1))
+        worker, worker_arguments = run_corpus_shard, (corpus_file,)
+        runs = len(jobs)
+
+    with ResultsSink(results_file, flush_every=flush_every) as sink:
+        if workers == 1:
+            for job in jobs:
+                sink.write_rows(worker([job], *worker_arguments))
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # Imported here, it is slow to import for serial runs
+
+            workers = workers or os.cpu_count() or 1
+            if shard_size is None:
+                shard_size = max(1, runs // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                shards = [jobs[i:i + shard_size] for i in range(0, len(jobs), shard_size)]
+                arguments = [[argument] * len(shards) for argument in worker_arguments]
+                # map() yields shard results in submission order, so rows stay in run order
+                for rows in executor.map(worker, shards, *arguments):
+                    sink.write_rows(rows)
+
+    print(f"Experiment completed. Results saved to {results_file}")
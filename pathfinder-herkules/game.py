@@ -0,0 +1,848 @@
+"""
+The interactive game: the pygame Grid and Sidebar, and the Game loop. Start it with `python create_map.py play`.
+The command line (create_map.py) only imports this module, and so pygame, for the interactive modes.
+"""
+import pygame
+import sys
+from pygame import Rect
+import custom_constants as c
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+import math
+import random
+import time
+from utils import ask_input
+from grid_model import GridModel
+import map_io
+
+
+def upload_and_scale_image(image_path: str, cell_size: int) -> pygame.Surface:
+    """
+    Load and scale the image to the cell size.
+    :param image_path: path to the image file
+    :param cell_size: side of a grid cell in pixels
+    :return: pygame object
+    """
+    image = pygame.image.load(image_path)
+    image = pygame.transform.scale(image, (cell_size, cell_size))
+    return image
+
+
+@lru_cache(maxsize=None)
+def load_sprite_atlas(cell_size: int) -> Dict[int, pygame.Surface]:
+    """
+    Load every cell sprite once per cell size.
+    :param cell_size: side of a grid cell in pixels
+    :return: cell id -> scaled image
+    """
+    return {cell_id: upload_and_scale_image(path, cell_size) for cell_id, path in c.SPRITE_PATHS.items()}
+
+
+@lru_cache(maxsize=None)
+def build_overlay_tile(cell_size: int, color: Tuple[int, int, int, int]) -> pygame.Surface:
+    """
+    Build a translucent tile once per cell size and color.
+    :param cell_size: side of a grid cell in pixels
+    :param color: RGBA color
+    :return: pygame object
+    """
+    tile = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+    tile.fill(color)
+    return tile
+
+
+class Grid(GridModel):
+    """
+    Class to represent the grid and its properties, and to draw it with pygame.
+    """
+
+    def __init__(self, grid_size: int):
+        super().__init__(grid_size)
+        self.cell_size = c.WINDOW_SIZE // grid_size
+
+        self.path_to_display = None
+        self.path_cells = set()
+        self.path_version = 0
+
+        # Sprites and overlay tiles are shared by every Grid with the same cell size
+        self.sprites = load_sprite_atlas(self.cell_size)
+        self.violation_tile = build_overlay_tile(self.cell_size, c.RED_WITH_TRANSPARENCY_ALPHA)
+        self.path_tile = build_overlay_tile(self.cell_size, c.GREEN_WITH_TRANSPARENCY_ALPHA)
+
+        # Static map (sprites and grid lines, no overlays), patched cell by cell as the map changes
+        self.background = None
+        # What the overlays on screen were drawn for: (screen, check_map, path_version, killed_hidras)
+        self.drawn_overlay_state = None
+
+    def cell_rect(self, x: int, y: int) -> Rect:
+        return pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
+
+    def draw_background_cell(self, x: int, y: int) -> None:
+        """
+        Redraw one cell of the cached background: sprite and grid lines.
+        """
+        rect = self.cell_rect(x, y)
+        self.background.fill(c.WHITE, rect)
+        sprite = self.sprites.get(self.grid[y][x])
+        if sprite is not None:
+            self.background.blit(sprite, rect.topleft)
+        pygame.draw.rect(self.background, c.GREY, rect, c.GRID_WIDTH)
+
+    def draw_overlays(self, screen: pygame.Surface, x: int, y: int, check_map: bool, killed_hidras) -> None:
+        """
+        Draw what goes on top of the background for one cell.
+        """
+        rect = self.cell_rect(x, y)
+        tinted = False
+        if check_map and (x, y) in self.violating_cells:
+            screen.blit(self.violation_tile, rect.topleft)  # Red color with alpha for transparency
+            tinted = True
+        if (x, y) in self.path_cells:
+            screen.blit(self.path_tile, rect.topleft)  # Green overlay for the path
+            tinted = True
+        if tinted:
+            pygame.draw.rect(screen, c.GREY, rect, c.GRID_WIDTH)  # Grid lines stay on top of the tint
+        if (x, y) in killed_hidras:
+            screen.blit(self.sprites[c.HIDRA_ID], rect.topleft)
+
+    def draw(self, screen: pygame.Surface, check_map: bool, killed_hidras: List[Tuple[int, int]]) -> List[Rect]:
+        """
+        Draw the grid on the screen, with all the elements.
+        Only the cells that changed since the last call are redrawn: the static map is cached in
+        self.background, and the whole grid is only recomposed when the overlays change
+        (check map toggled, new path, hydra killed) or the whole map changed.
+        :param screen: pygame object
+        :param check_map: if map is valid or no
+        :param killed_hidras: list of positions where hydras were killed
+        :return: screen areas that were redrawn, for pygame.display.update
+        """
+        grid_side = self.grid_size * self.cell_size
+        if self.background is None or self.all_dirty:
+            self.background = pygame.Surface((grid_side, grid_side))
+            for y in range(self.grid_size):
+                for x in range(self.grid_size):
+                    self.draw_background_cell(x, y)
+            self.drawn_overlay_state = None
+        else:
+            for x, y in self.dirty_cells:
+                self.draw_background_cell(x, y)
+
+        overlay_state = (screen, check_map, self.path_version, tuple(killed_hidras))
+        if overlay_state != self.drawn_overlay_state:
+            # Recompose the whole grid, overlays only where there are any
+            screen.blit(self.background, (0, 0))
+            overlay_cells = set(self.path_cells).union(killed_hidras)
+            if check_map:
+                overlay_cells.update(self.violating_cells)
+            for x, y in overlay_cells:
+                self.draw_overlays(screen, x, y, check_map, killed_hidras)
+            dirty_rects = [pygame.Rect(0, 0, grid_side, grid_side)]
+        else:
+            dirty_rects = []
+            for x, y in self.dirty_cells:
+                rect = self.cell_rect(x, y)
+                screen.blit(self.background, rect.topleft, rect)
+                self.draw_overlays(screen, x, y, check_map, killed_hidras)
+                dirty_rects.append(rect)
+
+        self.drawn_overlay_state = overlay_state
+        self.dirty_cells.clear()
+        self.all_dirty = False
+        return dirty_rects
+
+    def display_path(self, path):
+        if path is self.path_to_display:
+            return
+        self.path_to_display = path
+        self.path_cells = set(path) if path else set()
+        self.path_version += 1
+
+
+class Sidebar:
+    def __init__(self):
+        self.selected_tool = "wall"
+        self.check_map = False
+
+        # Fonts and rendered labels are created once and reused every frame
+        self.fonts = {size: pygame.font.Font(None, size)
+                      for size in (c.PYGAME_FONT, c.RESULT_FONT_SIZE, c.STATS_FONT_SIZE)}
+        self.text_cache = {}
+
+    def render_text(self, text: str, font_size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Render a label, or reuse it if it was already rendered with the same font size and color.
+        :return: pygame surface with the text
+        """
+        key = (text, font_size, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= c.TEXT_CACHE_SIZE:
+                self.text_cache.clear()  # Labels that change every frame (frame time) would grow it forever
+            surface = self.fonts[font_size].render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+
+    def draw(self, screen: pygame.Surface, valid_map: bool, search_results=None, current_algorithm=None,
+             frame_time_ms=None, search_stats=None) -> Tuple[List[Rect], Rect, Rect]:
+        """
+        Draws a sidebar with tool buttons and a "Check Map" slider.
+
+        :param screen: pygame screen surface
+        :param valid_map: whether the current map is valid
+        :param search_results: dictionary of search algorithm runtimes
+        :param current_algorithm: the current algorithm being displayed
+        :param frame_time_ms: time the last frame took to render, shown at the bottom
+        :param search_stats: stats of the current algorithm's search, shown below it
+        :return: wall_button and eraser_button as Rect objects for collision detection
+        """
+
+        # Draw the sidebar background
+        sidebar_rect = pygame.Rect(c.WINDOW_SIZE, 0, c.SIDEBAR_WIDTH, c.WINDOW_SIZE)
+        pygame.draw.rect(screen, c.LIGHT_GREY, sidebar_rect)
+
+        # Draw tool buttons
+        tool_buttons = []
+        current_y = c.SIDEBAR_PADDING
+        for label in c.BUTTON_LABELS:
+            button_rect = pygame.Rect(c.BUTTON_X, current_y, c.BUTTON_WIDTH, c.BUTTON_HEIGHT)
+            button_color = c.BLACK if self.selected_tool == label.lower() else c.DARK_GREY
+            pygame.draw.rect(screen, button_color, button_rect)
+
+            button_text = self.render_text(label, c.PYGAME_FONT, c.WHITE)
+            text_x = c.BUTTON_X + (c.BUTTON_WIDTH - button_text.get_width()) // 2
+            text_y = current_y + (c.BUTTON_HEIGHT - button_text.get_height()) // 2
+            screen.blit(button_text, (text_x, text_y))
+
+            tool_buttons.append(button_rect)
+            current_y += c.BUTTON_HEIGHT + c.BUTTON_SPACING
+
+        # Draw "Check Map" slider
+        slider_rect = self.draw_slider(screen, valid_map)
+        current_y += c.BUTTON_SPACING + c.BUTTON_HEIGHT  # Move y-position below the slider
+
+        # Draw "RUN" button always, but change its appearance based on validity
+        run_button_rect = pygame.Rect(c.BUTTON_X, c.RUN_BUTTON_Y, c.BUTTON_WIDTH, c.BUTTON_HEIGHT)
+        if self.check_map and valid_map:
+            run_button_color = c.BLUE  # Active RUN button color
+            run_button_text_color = c.WHITE
+        else:
+            run_button_color = c.DARK_GREY  # Inactive RUN button color
+            run_button_text_color = c.LIGHT_GREY
+
+        pygame.draw.rect(screen, run_button_color, run_button_rect, border_radius=5)
+
+        run_button_text = self.render_text("RUN", c.PYGAME_FONT, run_button_text_color)
+        text_x = run_button_rect.x + (c.BUTTON_WIDTH - run_button_text.get_width()) // 2
+        text_y = run_button_rect.y + (c.BUTTON_HEIGHT - run_button_text.get_height()) // 2
+        screen.blit(run_button_text, (text_x, text_y))
+
+        # Add a border to indicate it's clickable when active
+        if self.check_map and valid_map:
+            pygame.draw.rect(screen, c.GREEN, run_button_rect, 2, border_radius=5)
+
+        if search_results:
+            for alg_name, runtime in search_results.items():
+                result_text = f"{alg_name}: {runtime}"  # runtime is already formatted
+                result_surface = self.render_text(result_text, c.RESULT_FONT_SIZE, c.BLACK)
+                text_x = c.BUTTON_X
+                screen.blit(result_surface, (text_x, current_y))
+                current_y += result_surface.get_height() + 5  # Adjust spacing as needed
+
+        current_y += 10  # Add some padding before displaying the current algorithm
+        if current_algorithm:
+            algorithm_text = f"Displaying {current_algorithm}"
+            algorithm_surface = self.render_text(algorithm_text, c.RESULT_FONT_SIZE, c.BLACK)
+            text_x = c.BUTTON_X
+            screen.blit(algorithm_surface, (text_x, current_y))
+            current_y += algorithm_surface.get_height() + 5  # Adjust spacing as needed
+
+            # Instruction to the user
+            instruction_surface = self.render_text("Press SPACE", c.RESULT_FONT_SIZE, c.BLACK)
+            screen.blit(instruction_surface, (text_x, current_y))
+            current_y += instruction_surface.get_height() + 5
+
+            if search_stats:
+                for stats_text in self.format_search_stats(search_stats):
+                    stats_surface = self.render_text(stats_text, c.STATS_FONT_SIZE, c.DARK_GREY)
+                    screen.blit(stats_surface, (text_x, current_y))
+                    current_y += stats_surface.get_height() + 3
+
+        if frame_time_ms is not None:
+            frame_surface = self.render_text(f"Frame: {frame_time_ms:.1f} ms", c.RESULT_FONT_SIZE, c.BLACK)
+            screen.blit(frame_surface, (c.BUTTON_X, c.FRAME_TIME_Y))
+
+        return tool_buttons, slider_rect, run_button_rect
+
+    @staticmethod
+    def format_search_stats(search_stats) -> List[str]:
+        """
+        Short labels that fit the sidebar: expanded / generated, peak frontier / visited, reopened / path cost,
+        or the path's steps for the unweighted searches, whose cost is nan.
+        :return: lines of text
+        """
+        def value(field):
+            number = search_stats.get(field)
+            return "-" if number is None else f"{number:g}"
+
+        unweighted = math.isnan(search_stats.get('path_cost', 0))
+        length = f"Steps {value('path_steps')}" if unweighted else f"Cost {value('path_cost')}"
+        return [f"Exp {value('expanded')} Gen {value('generated')}",
+                f"Open {value('peak_frontier')} Seen {value('peak_visited')}",
+                f"Reopen {value('reopened')} {length}"]
+
+    def draw_slider(self, screen: pygame.Surface, valid_map: bool) -> Rect:
+        """
+        Draws the "Check Map" slider below the tool buttons.
+
+        :param screen: pygame screen surface
+        :param valid_map: whether the current map is valid
+        :return: slider Rect for collision detection
+        """
+
+        slider_rect = pygame.Rect(c.BUTTON_X, c.MAP_CHECK_Y, c.BUTTON_WIDTH, c.BUTTON_HEIGHT)
+        pygame.draw.rect(screen, c.DARK_GREY, slider_rect, border_radius=20)
+
+        circle_x = slider_rect.x + 20 if not self.check_map else slider_rect.x + c.BUTTON_WIDTH - 20
+        circle_y = slider_rect.y + c.BUTTON_HEIGHT // 2
+
+        # Set circle color based on the state and map validity
+        if self.check_map:
+            circle_color = c.GREEN if valid_map else c.RED
+        else:
+            circle_color = c.WHITE
+
+        pygame.draw.circle(screen, circle_color, (circle_x, circle_y), c.BUTTON_WIDTH // 4)
+
+        # Draw slider label
+        slider_text = self.render_text("Check Map", c.PYGAME_FONT, c.BLACK)
+        text_x = slider_rect.x + (c.BUTTON_WIDTH - slider_text.get_width()) // 2
+        text_y = slider_rect.y - 25  # Adjust as needed for spacing
+        screen.blit(slider_text, (text_x, text_y))
+
+        return slider_rect
+
+    def toggle_check_map(self) -> None:
+        self.check_map = not self.check_map  # Toggle the state
+
+    def select_tool(self, tool: str) -> None:
+        self.selected_tool = tool
+
+
+class Game:
+    ALGORITHM_METHOD_MAPPING = {
+        'BFS': 'bfs',
+        'DFS': 'dfs',
+        'Bi-BFS': 'bidirectional_bfs',
+        'UCS': 'ucs',
+        'A*': 'astar',
+        'JPS': 'jps',
+        'Bi-A*': 'bidirectional_astar',
+        'D* Lite': 'dstar'
+    }
+    ALGORITHM_LABELS = {method: algorithm for algorithm, method in ALGORITHM_METHOD_MAPPING.items()}
+
+    def __init__(self, auto_map: bool = True, map_file: Optional[str] = None, grid_size: Optional[int] = None):
+        """
+        :param auto_map: start from a generated map instead of an empty one
+        :param map_file: start from the map saved in this file (see map_io), its size replaces the grid size
+        :param grid_size: side length of the map, asked for if neither it nor a map file is given
+        """
+        self.search_paths = None
+        self.search_results = None
+        pygame.init()
+        self.grid_size = grid_size or c.GRID_SIZE
+        # Ask for grid size if not given and not loading a map
+        if grid_size is None and map_file is None:
+            self.grid_size = ask_input()
+
+        # Extend window width to fit the sidebar
+        self.screen = pygame.display.set_mode((c.WINDOW_SIZE + c.SIDEBAR_WIDTH, c.WINDOW_SIZE))
+        pygame.display.set_caption("Hercules finds his path underworld")
+        self.grid = map_io.load_map(map_file, Grid) if map_file else Grid(self.grid_size)
+        self.grid_size = self.grid.grid_size
+        # Stats of the latest search of every algorithm, shown next to its path
+        self.search_stats = {}
+        self.grid.add_search_hook(self.record_search_stats)
+        self.sidebar = Sidebar()
+        self.running = True
+        self.mouse_held = False
+
+        # Initialize hydra_killed flag and list of killed hydras
+        self.hydra_killed = False
+        self.killed_hidras = []
+
+        # Live path mode (toggled with L): the D* Lite path is repaired after every edit
+        self.live_path = False
+
+        # Helper function to generate random internal positions
+        def random_internal_position(grid_size):
+            return random.randint(1, grid_size - 2), random.randint(1, grid_size - 2)
+
+        # Automatically create map with random player and goal positions if auto_map is True
+        if auto_map and map_file is None:
+            player_pos = random_internal_position(self.grid_size)
+            goal_pos = random_internal_position(self.grid_size)
+            while goal_pos == player_pos:
+                goal_pos = random_internal_position(self.grid_size)
+
+            self.grid.create_auto_map(player_pos, goal_pos, place_obstacles=True)
+
+        self.grid.update_violating_cells()
+        self.search_paths = None
+        self.search_results = None
+
+        self.displaying_paths = False
+        self.algorithms_list = ['BFS', 'DFS', 'Bi-BFS', 'UCS', 'A*', 'JPS', 'Bi-A*', 'D* Lite']
+        self.current_algorithm_index = 0
+        self.search_paths = {}
+
+    def run(self) -> None:
+        clock = pygame.time.Clock()
+        self.frame_time_ms = None
+        self.screen.fill(c.WHITE)
+        while self.running:
+            frame_start = time.perf_counter()
+            # Only the grid cells that changed are redrawn, plus the sidebar
+            dirty_rects = self.grid.draw(self.screen, self.sidebar.check_map, self.killed_hidras)
+            dirty_rects.append(pygame.Rect(c.WINDOW_SIZE, 0, c.SIDEBAR_WIDTH, c.WINDOW_SIZE))
+
+            current_algorithm = None
+            if self.displaying_paths:
+                current_algorithm = self.algorithms_list[self.current_algorithm_index]
+
+            # Draw the sidebar and get tool buttons, slider_rect, and run_button_rect
+            if hasattr(self, 'search_results'):
+                tool_buttons, slider, run_button = self.sidebar.draw(
+                    self.screen,
+                    self.grid.valid_map,
+                    self.search_results,
+                    current_algorithm,
+                    frame_time_ms=self.frame_time_ms,
+                    search_stats=self.search_stats.get(current_algorithm)
+                )
+            else:
+                tool_buttons, slider, run_button = self.sidebar.draw(
+                    self.screen,
+                    self.grid.valid_map,
+                    current_algorithm=current_algorithm,
+                    frame_time_ms=self.frame_time_ms,
+                    search_stats=self.search_stats.get(current_algorithm)
+                )
+
+            pygame.display.update(dirty_rects)  # Refresh the changed parts of the screen
+            self.frame_time_ms = (time.perf_counter() - frame_start) * 1000
+
+            for event in self.wait_for_events():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_l:
+                        self.live_path = not self.live_path
+                        self.displaying_paths = False
+                        print(f"Live path {'on' if self.live_path else 'off'}")
+                        if self.live_path:
+                            self.show_live_path()
+                        else:
+                            self.grid.display_path(None)
+                            if hasattr(self, 'search_results'):
+                                del self.search_results
+                    elif event.key == pygame.K_s:
+                        self.save_map()
+                    elif event.key == pygame.K_o:
+                        self.load_map()
+                    elif event.key == pygame.K_SPACE and self.displaying_paths:
+                        # Proceed to the next algorithm's path
+                        self.current_algorithm_index += 1
+                        if self.current_algorithm_index < len(self.algorithms_list):
+                            current_algorithm = self.algorithms_list[self.current_algorithm_index]
+                            self.grid.display_path(self.search_paths.get(current_algorithm))
+                        else:
+                            # No more algorithms; stop displaying paths
+                            self.displaying_paths = False
+                            self.grid.display_path(None)  # Clear the path
+
+                        # If hydra was killed, remove it from the grid once past the unweighted searches
+                        if self.hydra_killed and self.current_algorithm_index > self.algorithms_list.index('Bi-BFS'):
+                            self.remove_dead_hidras()
+                            self.hydra_killed = False
+
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    self.mouse_held = True
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+
+                    # Check if a tool button is clicked
+                    tool_clicked = False
+                    for index, button_rect in enumerate(tool_buttons):
+                        if button_rect.collidepoint(mouse_x, mouse_y):
+                            selected_tool = c.BUTTON_LABELS[index].lower()
+                            self.sidebar.select_tool(selected_tool)
+                            tool_clicked = True
+                            break  # Exit after handling the button click
+
+                    if not tool_clicked:
+                        # Check if slider was clicked
+                        if slider.collidepoint(mouse_x, mouse_y):
+                            self.sidebar.toggle_check_map()
+                        # Check if RUN button was clicked and is active
+                        elif run_button.collidepoint(mouse_x, mouse_y):
+                            if self.sidebar.check_map and self.grid.valid_map:
+                                self.run_game()
+                            else:
+                                print("RUN button is inactive. Please ensure the map is valid and checked.")
+
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    self.mouse_held = False
+
+            # Handle drawing/erasing on the grid
+            if self.mouse_held:
+                mouse_x, mouse_y = pygame.mouse.get_pos()
+                if mouse_x < c.WINDOW_SIZE:  # Only interact within the grid area
+                    grid_x, grid_y = mouse_x // self.grid.cell_size, mouse_y // self.grid.cell_size
+                    if 0 <= grid_x < self.grid_size and 0 <= grid_y < self.grid_size:
+                        self.grid.update_cell(grid_x, grid_y, self.sidebar.selected_tool)
+                        # Clear the displayed path and reset variables
+                        self.displaying_paths = False
+                        if self.live_path:
+                            self.show_live_path()
+                        else:
+                            self.grid.display_path(None)
+                            if hasattr(self, 'search_results'):
+                                del self.search_results
+
+            clock.tick(c.FPS)  # Never redraw faster than FPS
+
+        pygame.quit()  # Close the window and quit the game
+        sys.exit()  # Exit the program
+
+    def save_map(self, path: str = c.MAP_FILE) -> None:
+        map_io.save_map(self.grid, path)
+        print(f"Map saved to {path}")
+
+    def load_map(self, path: str = c.MAP_FILE) -> None:
+        """
+        Replace the map with the one saved in a map file, whatever its size.
+        """
+        try:
+            grid = map_io.load_map(path, Grid)
+        except (OSError, ValueError) as error:
+            print(f"Could not load {path}: {error}")
+            return
+        self.grid.remove_search_hook(self.record_search_stats)
+        self.grid = grid
+        self.grid_size = grid.grid_size
+        self.grid.add_search_hook(self.record_search_stats)
+
+        # Nothing searched on the old map applies to this one
+        self.search_stats = {}
+        self.search_paths = {}
+        self.displaying_paths = False
+        self.hydra_killed = False
+        self.killed_hidras = []
+        if hasattr(self, 'search_results'):
+            del self.search_results
+        self.screen.fill(c.WHITE)  # The new map may not cover all of the old one
+        if self.live_path:
+            self.show_live_path()
+        print(f"Map loaded from {path}")
+
+    def show_live_path(self) -> None:
+        """
+        Repair and display the D* Lite path between the player and the goal on the map.
+        """
+        player_pos, goal_pos = self.grid.player_pos, self.grid.goal_pos
+        if not player_pos or not goal_pos:
+            self.grid.display_path(None)
+            self.search_results = {'Live D*': "No player/goal"}
+            return
+        path, runtime = self.grid.dstar(player_pos, goal_pos)
+        self.grid.display_path(path)
+        if path:
+            cost = self.grid.dstar_planner.cost_to_goal()
+            self.search_results = {'Live D*': f"Cost: {cost:g}, Time: {runtime * 1000:.2f} ms"}
+        else:
+            self.search_results = {'Live D*': "FAIL"}
+
+    def record_search_stats(self, method_name, start, goal, path, runtime, stats) -> None:
+        """
+        Search hook: keep the stats of the latest search of every algorithm for the sidebar.
+        """
+        self.search_stats[self.ALGORITHM_LABELS.get(method_name, method_name)] = dict(stats)
+
+    def wait_for_events(self) -> List[pygame.event.Event]:
+        """
+        While the mouse is held the loop keeps going to paint under the cursor.
+        Otherwise nothing changes until an event arrives, so block instead of spinning.
+        :return: pending events
+        """
+        if self.mouse_held:
+            return pygame.event.get()
+        event = pygame.event.wait(c.IDLE_WAIT_MS)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
+
+    # After generating map, compute energy:
+    def run_game(self):
+        print("RUN button clicked! Starting the game...")
+
+        # Get the player and goal positions
+        player_pos = None
+        goal_pos = None
+        for y in range(self.grid.grid_size):
+            for x in range(self.grid.grid_size):
+                if self.grid.grid[y][x] == c.PLAYER_ID:
+                    player_pos = (x, y)
+                elif self.grid.grid[y][x] == c.WIFEY_ID:
+                    goal_pos = (x, y)
+                if player_pos and goal_pos:
+                    break
+            if player_pos and goal_pos:
+                break
+
+        if not player_pos or not goal_pos:
+            print("Player or goal not found.")
+            return
+
+        # Compute the initial energy:
+        # energy = grid_size²
+        self.energy = self.grid_size ** 2
+
+        # Store energy for UCS and A*
+        self.search_energy = {}  # { 'UCS': leftover_energy or None, 'A*': leftover_energy or None }
+
+        self.perform_searches(player_pos, goal_pos)
+
+    def compute_path_cost(self, path):
+        # path is a list of (x,y), a cheapest one, as every weighted search returns
+        # Its cost is the CELL_COSTS of the start cell plus the start's entry in the goal's distance field,
+        # computed once per goal and map
+        (sx, sy), goal = path[0], path[-1]
+        start_cost = c.CELL_COSTS.get(self.grid.grid[sy][sx], 1)
+        return int(start_cost + self.grid.cost_to_goal((sx, sy), goal))
+
+    # In the Sidebar draw method, we will show energy only for UCS or A* if available.
+    # Modify the draw method or create a method to show energy when current algorithm is UCS or A*.
+
+    def draw(self, screen: pygame.Surface, valid_map: bool, search_results=None, current_algorithm=None) -> Tuple[
+        List[Rect], Rect, Rect]:
+        font = pygame.font.Font(None, c.PYGAME_FONT)  # Set font for button labels
+        sidebar_rect = pygame.Rect(c.WINDOW_SIZE, 0, c.SIDEBAR_WIDTH, c.WINDOW_SIZE)
+        pygame.draw.rect(screen, c.LIGHT_GREY, sidebar_rect)
+
+        tool_buttons = []
+        current_y = c.SIDEBAR_PADDING
+        for label in c.BUTTON_LABELS:
+            button_rect = pygame.Rect(c.BUTTON_X, current_y, c.BUTTON_WIDTH, c.BUTTON_HEIGHT)
+            button_color = c.BLACK if self.selected_tool == label.lower() else c.DARK_GREY
+            pygame.draw.rect(screen, button_color, button_rect)
+
+            button_text = font.render(label, True, c.WHITE)
+            text_x = c.BUTTON_X + (c.BUTTON_WIDTH - button_text.get_width()) // 2
+            text_y = current_y + (c.BUTTON_HEIGHT - button_text.get_height()) // 2
+            screen.blit(button_text, (text_x, text_y))
+
+            tool_buttons.append(button_rect)
+            current_y += c.BUTTON_HEIGHT + c.BUTTON_SPACING
+
+        # Draw "Check Map" slider
+        slider_rect = self.draw_slider(screen, font, valid_map)
+        current_y += c.BUTTON_SPACING + c.BUTTON_HEIGHT
+
+        run_button_rect = pygame.Rect(c.BUTTON_X, c.RUN_BUTTON_Y, c.BUTTON_WIDTH, c.BUTTON_HEIGHT)
+        if self.check_map and valid_map:
+            run_button_color = c.BLUE  # Active RUN button color
+            run_button_text_color = c.WHITE
+        else:
+            run_button_color = c.DARK_GREY  # Inactive RUN button color
+            run_button_text_color = c.LIGHT_GREY
+
+        pygame.draw.rect(screen, run_button_color, run_button_rect, border_radius=5)
+        run_button_text = font.render("RUN", True, run_button_text_color)
+        text_x = run_button_rect.x + (c.BUTTON_WIDTH - run_button_text.get_width()) // 2
+        text_y = run_button_rect.y + (c.BUTTON_HEIGHT - run_button_text.get_height()) // 2
+        screen.blit(run_button_text, (text_x, text_y))
+
+        if self.check_map and valid_map:
+            pygame.draw.rect(screen, c.GREEN, run_button_rect, 2, border_radius=5)
+
+        if search_results:
+            result_font = pygame.font.Font(None, c.RESULT_FONT_SIZE)
+            for alg_name, result in search_results.items():
+                # If current_algorithm is UCS or A*, and we are currently displaying that algorithm,
+                # we show energy or "Energy < 0". For BFS/DFS, we show time as before.
+
+                result_text = f"{alg_name}: {result}"
+                result_surface = result_font.render(result_text, True, c.BLACK)
+                text_x = c.BUTTON_X
+                screen.blit(result_surface, (text_x, current_y))
+                current_y += result_surface.get_height() + 5
+
+        current_y += 10
+        if current_algorithm:
+            algorithm_font = pygame.font.Font(None, c.RESULT_FONT_SIZE)
+            algorithm_text = f"Displaying {current_algorithm}"
+            algorithm_surface = algorithm_font.render(algorithm_text, True, c.BLACK)
+            text_x = c.BUTTON_X
+            screen.blit(algorithm_surface, (text_x, current_y))
+            current_y += algorithm_surface.get_height() + 5
+
+            # Instruction to the user
+            instruction_font = pygame.font.Font(None, c.RESULT_FONT_SIZE)
+            instruction_text = "Press SPACE"
+            instruction_surface = instruction_font.render(instruction_text, True, c.BLACK)
+            screen.blit(instruction_surface, (text_x, current_y))
+            current_y += instruction_surface.get_height() + 5
+
+        return tool_buttons, slider_rect, run_button_rect
+
+    # When space is pressed and we cycle through algorithms, after finishing, we must clear energy display.
+    # In the event loop:
+    # After finishing viewing all paths (self.displaying_paths = False), we no longer show energy.
+    # This is already handled since we show energy only while displaying_paths = True and have current_algorithm.
+
+    # Also, when RUN button is clicked again (run_game called again), we recalculate energy and reset search_results
+    # and search_energy.
+    # This will ensure a fresh start each time.
+
+    def perform_searches(self, player_pos, goal_pos):
+        # Run BFS and DFS as before
+        bfs_path, bfs_runtime = self.grid.bfs(player_pos, goal_pos)
+        dfs_path, dfs_runtime = self.grid.dfs(player_pos, goal_pos)
+        bi_bfs_path, bi_bfs_runtime = self.grid.bidirectional_bfs(player_pos, goal_pos)
+
+        # BFS/DFS store runtime results
+        self.search_results = {
+            'BFS': f"{bfs_runtime * 1000:.2f} ms" if bfs_runtime is not None else "FAIL",
+            'DFS': f"{dfs_runtime * 1000:.2f} ms" if dfs_runtime is not None else "FAIL",
+            'Bi-BFS': f"{bi_bfs_runtime * 1000:.2f} ms" if bi_bfs_runtime is not None else "FAIL",
+            'UCS': "FAIL",
+            'A*': "FAIL",
+            'JPS': "FAIL",
+            'Bi-A*': "FAIL",
+            'D* Lite': "FAIL"
+        }
+
+        self.search_paths = {
+            'BFS': bfs_path,
+            'DFS': dfs_path,
+            'Bi-BFS': bi_bfs_path,
+            'UCS': None,
+            'A*': None,
+            'JPS': None,
+            'Bi-A*': None,
+            'D* Lite': None
+        }
+
+        # For the weighted searches, we consider energy and might need to kill the hydra if no path is found.
+        # D* Lite keeps its search between runs, so after a kill it only repairs around the hydra cell.
+        for algorithm in ['UCS', 'A*', 'JPS', 'Bi-A*', 'D* Lite']:
+            method_name = self.ALGORITHM_METHOD_MAPPING.get(algorithm)
+            if not method_name:
+                continue
+            search_method = getattr(self.grid, method_name, None)
+            if not search_method:
+                continue
+
+            path, runtime = search_method(player_pos, goal_pos)
+            if path:
+                # Compute the path cost
+                path_cost = self.compute_path_cost(path)
+                leftover_energy = self.energy - path_cost
+                if leftover_energy >= 0:
+                    # Success: Show leftover energy AND time
+                    self.search_results[algorithm] = f"Energy: {leftover_energy}, Time: {runtime * 1000:.2f} ms"
+                    self.search_paths[algorithm] = path
+                    self.search_energy[algorithm] = leftover_energy
+                else:
+                    # Path found but not enough energy
+                    self.search_results[algorithm] = f"Energy < 0, Time: {runtime * 1000:.2f} ms"
+                    self.search_paths[algorithm] = None
+                    self.search_energy[algorithm] = None
+            else:
+                # No path found initially, attempt to kill hydra multiple times
+                print(f"{algorithm} failed to find a path. Attempting to kill the Hydra...")
+                attempts = 0
+                success = False
+                while attempts < 10:
+                    killed = self.try_kill_hydra()
+                    if killed:
+                        print(f"Hydra killed on attempt {attempts + 1}. Re-running {algorithm}...")
+                        # Re-run the search after killing hydra
+                        path, runtime = search_method(player_pos, goal_pos)
+                        if path:
+                            path_cost = self.compute_path_cost(path)
+                            leftover_energy = self.energy - path_cost
+                            if leftover_energy >= 0:
+                                self.search_results[
+                                    algorithm] = f"Energy: {leftover_energy}, Time: {runtime * 1000:.2f} ms"
+                                self.search_paths[algorithm] = path
+                                self.search_energy[algorithm] = leftover_energy
+                            else:
+                                self.search_results[algorithm] = f"Energy < 0, Time: {runtime * 1000:.2f} ms"
+                                self.search_paths[algorithm] = None
+                                self.search_energy[algorithm] = None
+                            success = True
+                            self.hydra_killed = True
+                            break
+                        else:
+                            # Even after killing Hydra, no path was found. This should be rare unless map is blocked.
+                            print("No path found even after Hydra was killed.")
+                            break
+                    else:
+                        print(f"Failed to kill Hydra on attempt {attempts + 1}.")
+                    attempts += 1
+
+                if not success:
+                    # Even after attempts, we couldn't kill hydra or find path
+                    self.search_results[algorithm] = "FAIL"
+                    self.search_paths[algorithm] = None
+
+        self.displaying_paths = True
+        self.current_algorithm_index = 0
+        self.algorithms_list = ['BFS', 'DFS', 'Bi-BFS', 'UCS', 'A*', 'JPS', 'Bi-A*', 'D* Lite']
+
+        current_algorithm = self.algorithms_list[self.current_algorithm_index]
+        self.grid.display_path(self.search_paths.get(current_algorithm))
+
+        print("Search algorithm results:")
+        for alg, res in self.search_results.items():
+            print(f"{alg}: {res}")
+        cache_stats = self.grid.search_cache.stats() if self.grid.search_cache else None
+        if cache_stats:
+            print(f"Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                  f"{cache_stats['size']} entries")
+
+    def try_kill_hydra(self):
+        """
+        Attempt to kill the hydra. Probability of success = 1/(hydra_heads).
+        If failed, hydra_heads += 1.
+        Returns True if killed, False if not.
+        """
+        if not self.grid.hydra_position:
+            return True  # No hydra present
+
+        success_prob = 1.0 / self.grid.hydra_heads
+        if random.random() < success_prob:
+            # Successfully killed the hydra
+            hx, hy = self.grid.hydra_position
+            self.grid.set_cell(hx, hy, c.EMPTY_CELL_ID)  # Mark as empty cell
+            self.killed_hidras.append((hx, hy))  # Add to killed hydras list for display
+            self.grid.hydra_position = None
+            self.grid.hydra_heads = 0
+            print("Hydra has been killed!")
+            return True
+        else:
+            # Failed attempt, hydra grows more heads
+            self.grid.hydra_heads += 1
+            print(f"Hydra evaded! It now has {self.grid.hydra_heads} heads.")
+            return False
+
+    def remove_dead_hidras(self):
+        """
+        Remove all killed Hydras from the killed_hidras list.
+        Since the grid cells are already set to EMPTY, nothing else is needed.
+        """
+        if self.killed_hidras:
+            for hx, hy in self.killed_hidras:
+                # They are already set to EMPTY_CELL_ID in try_kill_hydra
+                print(f"Removed killed Hydra at ({hx}, {hy})")
+            self.killed_hidras.clear()
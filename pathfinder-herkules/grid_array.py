@@ -0,0 +1,203 @@
+"""
+Array-backed storage for the grid.
+
+Cell ids live in one contiguous uint8 buffer surrounded by a one-cell wall
+border, and a parallel float buffer holds the CELL_COSTS entry of every cell
+(inf for the border). Searches work on flat indices into these buffers: the
+four neighbours of index i are i - 1, i + 1, i - width and i + width, and the
+border guarantees they never fall outside the map, so no bounds test is needed.
+
+Both buffers are plain `bytearray` / `array` objects, so numpy is not required.
+When numpy is installed, `as_numpy` exposes zero-copy views of them, and
+`refresh_costs` works on whole arrays on large grids, which matters for maps
+loaded from files. numpy is only imported then, small maps never need it.
+
+The array also keeps a 64-bit fingerprint of its content, Zobrist style: the
+XOR of a hash of (index, cell id) over every non-empty cell. A single-cell
+change updates it with two XORs, so caches can key results on it cheaply.
+"""
+import re
+from array import array
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import custom_constants as c
+from utils import optional_module
+
+if TYPE_CHECKING:
+    import numpy as np
+
+INF = float('inf')
+
+# Cost of entering a cell, indexed by cell id
+COST_TABLE = [float(c.CELL_COSTS.get(cell_id, 1)) for cell_id in range(256)]
+# 1 for the cells BFS/DFS cannot enter, indexed by cell id
+UNWEIGHTED_BLOCKED = bytes(cell_id in (c.WALL_ID, c.HIDRA_ID) for cell_id in range(256))
+# 1 for the cells the weighted searches can enter, as a bytes.translate table
+PASSABLE = bytes(cost != INF for cost in COST_TABLE)
+_PASSABLE_RUN = re.compile(b'\x01+')
+
+MASK_64 = (1 << 64) - 1
+_NON_EMPTY = re.compile(b'[^' + re.escape(bytes([c.EMPTY_CELL_ID])) + b']')
+
+
+def cell_hash(index: int, cell_id: int) -> int:
+    """
+    Fingerprint contribution of one cell: splitmix64 of (index, cell id), so no random table is needed.
+    Empty cells contribute 0.
+    """
+    if cell_id == c.EMPTY_CELL_ID:
+        return 0
+    z = ((index << 8 | cell_id) + 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+class GridArray:
+    """
+    Padded flat cell-id and cost buffers for a grid_size x grid_size map.
+    """
+
+    def __init__(self, grid_size: int, fill: int = c.EMPTY_CELL_ID):
+        self.grid_size = grid_size
+        self.width = grid_size + 2
+        self.cells = bytearray([c.WALL_ID]) * (self.width * self.width)
+        self.costs = array('d', [INF]) * (self.width * self.width)
+
+        # Row views into the interior of the buffer, so grid[y][x] reads and writes the array directly
+        view = memoryview(self.cells)
+        self.rows = [view[self.index(0, y):self.index(0, y) + grid_size] for y in range(grid_size)]
+
+        # Neighbour offsets in the same order as search_core.DIRECTIONS
+        self.offsets = (-1, 1, -self.width, self.width)
+
+        self.fingerprint = 0
+        self.fill(fill)
+
+    def index(self, x: int, y: int) -> int:
+        """
+        :return: flat index of the cell (x, y)
+        """
+        return (y + 1) * self.width + x + 1
+
+    def coords(self, index: int) -> Tuple[int, int]:
+        """
+        :return: (x, y) of the flat index
+        """
+        y, x = divmod(index, self.width)
+        return x - 1, y - 1
+
+    def cell(self, x: int, y: int) -> int:
+        return self.cells[self.index(x, y)]
+
+    def set(self, x: int, y: int, cell_id: int) -> None:
+        """
+        Change one cell, keeping the cost buffer in sync.
+        """
+        index = self.index(x, y)
+        self.fingerprint ^= cell_hash(index, self.cells[index]) ^ cell_hash(index, cell_id)
+        self.cells[index] = cell_id
+        self.costs[index] = COST_TABLE[cell_id]
+
+    def fill(self, cell_id: int) -> None:
+        """
+        Set every interior cell to cell_id. The border stays a wall.
+        """
+        row = bytes([cell_id]) * self.grid_size
+        for y in range(self.grid_size):
+            start = self.index(0, y)
+            self.cells[start:start + self.grid_size] = row
+        self.refresh_costs()
+
+    def refresh_costs(self) -> None:
+        """
+        Recompute the cost buffer and the fingerprint from the cell ids.
+        Needed after cells were written directly through `rows` instead of `set`.
+        Updates in place, so numpy views taken with `as_numpy` stay valid.
+        """
+        if len(self.cells) >= c.NUMPY_MIN_CELLS and optional_module("numpy") is not None:
+            self._refresh_costs_numpy()
+            return
+        self.costs[:] = array('d', map(COST_TABLE.__getitem__, self.cells))
+        fingerprint = 0
+        cells = self.cells
+        for match in _NON_EMPTY.finditer(cells):
+            index = match.start()
+            fingerprint ^= cell_hash(index, cells[index])
+        self.fingerprint = fingerprint
+
+    def _refresh_costs_numpy(self) -> None:
+        """
+        refresh_costs with whole-array operations: the same costs, and cell_hash
+        computed in uint64 arithmetic, which wraps like the masked Python version.
+        """
+        np = optional_module("numpy")
+        cells = np.frombuffer(self.cells, dtype=np.uint8)
+        np.frombuffer(self.costs, dtype=np.float64)[:] = np.asarray(COST_TABLE)[cells]
+        indices = np.flatnonzero(cells != c.EMPTY_CELL_ID).astype(np.uint64)
+        z = (indices << np.uint64(8) | cells[indices.astype(np.intp)]) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        self.fingerprint = int(np.bitwise_xor.reduce(z ^ (z >> np.uint64(31)))) if len(z) else 0
+
+    def component_labels(self) -> array:
+        """
+        Label the 4-connected components of the passable cells in two passes. The runs of
+        passable cells of every row are found with one regex scan and joined (union-find) with
+        the runs they overlap in the row above, then every run is written out with its root label.
+        Work is per run rather than per cell.
+        :return: component label per flat index, 0 for cells that cannot be entered
+        """
+        width = self.width
+        mask = self.cells.translate(PASSABLE)
+        parent = []
+        runs = []
+
+        def find(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        above = []  # (start column, end column, run) of the previous row
+        for row_start in range(width, width * (width - 1), width):
+            current = []
+            first = 0
+            for match in _PASSABLE_RUN.finditer(mask, row_start, row_start + width):
+                start, end = match.span()
+                run = len(runs)
+                runs.append((start, end))
+                parent.append(run)
+                start_column, end_column = start - row_start, end - row_start
+                while first < len(above) and above[first][1] <= start_column:
+                    first += 1
+                overlap = first
+                while overlap < len(above) and above[overlap][0] < end_column:
+                    root, other = find(run), find(above[overlap][2])
+                    if root != other:
+                        parent[other] = root
+                    overlap += 1
+                current.append((start_column, end_column, run))
+            above = current
+
+        labels = array('i', [0]) * len(self.cells)
+        for run, (start, end) in enumerate(runs):
+            labels[start:end] = array('i', [find(run) + 1]) * (end - start)
+        return labels
+
+    def as_numpy(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Zero-copy 2D numpy views of the padded buffers (row 0 / column 0 are the border).
+        :return: cells (uint8), costs (float64)
+        """
+        np = optional_module("numpy")
+        if np is None:
+            raise ImportError("numpy is required for GridArray.as_numpy")
+        cells = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.width, self.width)
+        costs = np.frombuffer(self.costs, dtype=np.float64).reshape(self.width, self.width)
+        return cells, costs
+
+    def path_to_coords(self, indices: Optional[List[int]]) -> Optional[List[Tuple[int, int]]]:
+        if indices is None:
+            return None
+        return [self.coords(index) for index in indices]
@@ -0,0 +1,823 @@
+import functools
+import random
+import time
+from array import array
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import custom_constants as c
+import hpa
+import landmarks
+import search_cache
+import search_core
+from components import ComponentIndex, ring_keeps_connected
+from dstar_lite import DStarLite
+from grid_array import COST_TABLE, GridArray, INF
+
+NAN = float('nan')
+
+# Counters in last_search_stats after every search: the search core's work counters plus the path's cost
+# and its number of steps (-1 if no path was found)
+SEARCH_STAT_FIELDS = search_core.STAT_FIELDS + ('path_cost', 'path_steps')
+# Searches that ignore the cell costs, walking through lava and the hydra like through empty cells
+UNWEIGHTED_SEARCHES = ('bfs', 'dfs', 'bidirectional_bfs')
+
+
+def instrumented_search(search):
+    """
+    Decorator for every GridModel search method: add the path cost and steps to the search's stats
+    and hand them to the registered search hooks. The cost of a path of an unweighted search is nan:
+    the search did not try to make it cheap, and the cells it crosses can cost inf.
+    """
+    name = search.__name__
+    unweighted = name in UNWEIGHTED_SEARCHES
+
+    @functools.wraps(search)
+    def wrapper(self, start, goal):
+        path, runtime = search(self, start, goal)
+        self.last_search_stats['path_cost'] = NAN if unweighted and path else self.path_cost(path)
+        self.last_search_stats['path_steps'] = len(path) - 1 if path else -1
+        for hook in self.search_hooks:
+            hook(name, start, goal, path, runtime, self.last_search_stats)
+        return path, runtime
+
+    return wrapper
+
+
+def cached_search(search):
+    """
+    Decorator for the GridModel search methods: answer from the model's search cache when
+    the same search already ran on a map with the same content. A hit returns the path and
+    the stats measured when the search actually ran, and the time the lookup took as its
+    runtime, so a cached answer is never reported with the time of the original search.
+    """
+    name = search.__name__
+
+    @functools.wraps(search)
+    def wrapper(self, start, goal):
+        if self.search_cache is None:
+            return search(self, start, goal)
+        start_time = time.perf_counter()
+        key = (self.grid_size, self.array.fingerprint, name, start, goal)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            path, stats = cached
+            self.last_search_stats = dict(stats)
+            return path, time.perf_counter() - start_time
+        path, runtime = search(self, start, goal)
+        self.search_cache.put(key, (path, dict(self.last_search_stats)))
+        return path, runtime
+
+    return wrapper
+
+
+def reachable_only(search):
+    """
+    Decorator for the weighted searches: answer "no path" straight from the component index
+    when start and goal are in different components, instead of exhausting the frontier.
+    The stats still hold every field of SEARCH_STAT_FIELDS: no work and no path.
+    """
+    @functools.wraps(search)
+    def wrapper(self, start, goal):
+        start_time = time.perf_counter()
+        if not self.is_reachable(start, goal):
+            self.last_search_stats = {}
+            search_core.record_stats(self.last_search_stats, expanded=0, generated=0, peak_frontier=0, peak_visited=0)
+            self.last_search_stats['path_cost'] = INF
+            self.last_search_stats['path_steps'] = -1
+            return None, time.perf_counter() - start_time
+        return search(self, start, goal)
+
+    return wrapper
+
+
+class GridModel:
+    """
+    Headless grid: the map, its validation, the searches and map generation.
+    Nothing here touches pygame, so experiments and tests can build thousands of these cheaply.
+    Rendering lives in game.Grid.
+    """
+
+    def __init__(self, grid_size: int):
+        self.monster_enabled = None
+        self.hydra_heads = None
+        self.hydra_position = None
+        self.grid_size = grid_size
+        # grid[y][x] rows are views into the flat array, so both stay in sync
+        self.array = GridArray(grid_size)
+        self.grid = self.array.rows
+        self.player_in_the_game = False
+        self.goal_in_the_game = False
+        self.valid_map = False
+        self.violating_cells = set()
+
+        # Validation state, kept up to date by set_cell. None = not computed yet
+        self.border_reachable = None
+        self.player_pos = None
+        self.goal_pos = None
+
+        # Cells whose content or violation status changed since a renderer last consumed them.
+        # all_dirty means "anything may have changed", e.g. after a full recompute
+        self.dirty_cells = set()
+        self.all_dirty = True
+
+        # Counters of the last search run on this grid, e.g. {'expanded': 412, 'generated': 830, ...}
+        self.last_search_stats = {}
+        # Called as hook(method name, start, goal, path, runtime, stats) after every search
+        self.search_hooks = []
+        # Results of the searches, keyed by the map's fingerprint. Shared by all models, None disables it
+        self.search_cache = search_cache.shared_cache
+
+        # Called with the list of changed (x, y) cells after every edit, or None when the whole map changed
+        self.cell_listeners = []
+        self.hpa_planner = None  # Created by the first hpa() query
+        self.dstar_planner = None  # Created by the first dstar() query, replaced when the goal moves
+        self.landmark_tables = None  # Created by the first alt() query
+        self.distance_fields = {}  # Goal -> cost-to-goal array, dropped on any cell change
+        self.components = ComponentIndex(self)  # Reachability between passable cells
+
+    def add_cell_listener(self, listener: Callable[[Optional[List[Tuple[int, int]]]], None]) -> None:
+        """
+        Register a callback for cell changes, e.g. to keep a cache of the map up to date.
+        :param listener: called with the changed (x, y) cells, or None if the whole map changed
+        """
+        self.cell_listeners.append(listener)
+
+    def remove_cell_listener(self, listener: Callable[[Optional[List[Tuple[int, int]]]], None]) -> None:
+        self.cell_listeners.remove(listener)
+
+    def add_search_hook(self, hook: Callable[..., None]) -> None:
+        """
+        Register a callback that receives the stats of every search, e.g. to display or log them.
+        :param hook: called as hook(method name, start, goal, path, runtime, stats),
+                     stats holding the SEARCH_STAT_FIELDS the search reports
+        """
+        self.search_hooks.append(hook)
+
+    def remove_search_hook(self, hook: Callable[..., None]) -> None:
+        self.search_hooks.remove(hook)
+
+    def notify_cell_listeners(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        self.distance_fields.clear()
+        for listener in self.cell_listeners:
+            listener(cells)
+
+    def update_violating_cells(self) -> None:
+        """
+        Highlight with red all the violations and check if the map is valid.
+        Full recompute: finds every cell reachable from the edges and locates player and goal.
+        Single-cell edits made through set_cell keep this state up to date incrementally,
+        so this only has to run after cells were written directly into self.grid.
+        :return: None
+        """
+        self.border_reachable = set()
+        queue = deque()
+        grid_size = self.grid_size
+
+        # Start BFS from the edges and enqueue non-wall cells
+        for x in range(grid_size):
+            for y in [0, grid_size - 1]:
+                if self.grid[y][x] != c.WALL_ID and (x, y) not in self.border_reachable:
+                    queue.append((x, y))
+                    self.border_reachable.add((x, y))
+
+        for y in range(grid_size):
+            for x in [0, grid_size - 1]:
+                if self.grid[y][x] != c.WALL_ID and (x, y) not in self.border_reachable:
+                    queue.append((x, y))
+                    self.border_reachable.add((x, y))
+
+        # Perform BFS to find all reachable cells from edges
+        self._flood_border_reachable(queue)
+
+        # Locate player and goal positions
+        self.player_pos = None
+        self.goal_pos = None
+        for y in range(grid_size):
+            for x in range(grid_size):
+                if self.grid[y][x] == c.PLAYER_ID:
+                    self.player_pos = (x, y)
+                elif self.grid[y][x] == c.WIFEY_ID:
+                    self.goal_pos = (x, y)
+                # Early exit if both are found
+                if self.player_pos and self.goal_pos:
+                    break
+            if self.player_pos and self.goal_pos:
+                break
+
+        self.all_dirty = True
+        self.dirty_cells.clear()
+        self.update_validity()
+
+    def update_validity(self) -> None:
+        """
+        Decide if the map is valid from the tracked state, without scanning the grid.
+        :return: None
+        """
+        if self.border_reachable is None:
+            self.update_violating_cells()
+            return
+
+        player_enclosed = False
+        goal_enclosed = False
+
+        # Check if player and goal are enclosed
+        if self.player_pos and self.goal_pos:
+            player_enclosed = self.player_pos not in self.border_reachable
+            goal_enclosed = self.goal_pos not in self.border_reachable
+
+        valid_map = player_enclosed and goal_enclosed and self.player_in_the_game and self.goal_in_the_game
+        if valid_map != self.valid_map:
+            self.all_dirty = True  # Every violating cell switches its highlight
+        self.valid_map = valid_map
+        self.violating_cells = set() if self.valid_map else self.border_reachable
+
+    def _flood_border_reachable(self, queue: deque) -> None:
+        """
+        Grow border_reachable from the queued cells (already in the set) through non-wall cells.
+        """
+        grid_size = self.grid_size
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < grid_size and 0 <= ny < grid_size:
+                    if (nx, ny) not in self.border_reachable and self.grid[ny][nx] != c.WALL_ID:
+                        self.border_reachable.add((nx, ny))
+                        self.dirty_cells.add((nx, ny))
+                        queue.append((nx, ny))
+
+    def _is_border_connected(self, x: int, y: int) -> bool:
+        """
+        :return: True if (x, y) is outside the grid or reachable from the edges
+        """
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return True
+        return (x, y) in self.border_reachable
+
+    def _wall_keeps_region_connected(self, x: int, y: int) -> bool:
+        """
+        Local test for a new wall at (x, y), a cell that was reachable from the edges.
+        Looking at the 8 cells around it (cells outside the grid count as reachable), the wall
+        can't cut anything off if all of its reachable 4-neighbours lie on one unbroken arc
+        of reachable cells: any route through (x, y) can go around it along that arc.
+        :return: True if the reachable region is still connected without (x, y)
+        """
+        return ring_keeps_connected([self._is_border_connected(x + dx, y + dy) for dx, dy in c.NEIGHBOUR_RING])
+
+    def _update_border_reachable(self, x: int, y: int, old_id: int, cell_id: int) -> None:
+        """
+        Patch border_reachable after the single cell (x, y) changed from old_id to cell_id.
+        Only walls matter: removing one may extend the region by a local flood fill, adding one
+        shrinks it by that cell unless the local test can't rule out a split, and only then the
+        whole region is recomputed.
+        """
+        if old_id == c.WALL_ID and cell_id != c.WALL_ID:
+            on_edge = x in (0, self.grid_size - 1) or y in (0, self.grid_size - 1)
+            touches_region = any((x + dx, y + dy) in self.border_reachable
+                                 for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)])
+            if on_edge or touches_region:
+                self.border_reachable.add((x, y))
+                self._flood_border_reachable(deque([(x, y)]))
+        elif old_id != c.WALL_ID and cell_id == c.WALL_ID and (x, y) in self.border_reachable:
+            self.border_reachable.discard((x, y))
+            if not self._wall_keeps_region_connected(x, y):
+                self.update_violating_cells()
+
+    def _find_cell(self, cell_id: int) -> Optional[Tuple[int, int]]:
+        """
+        :return: (x, y) of the first cell with this id, None if there is none
+        """
+        index = self.array.cells.find(cell_id)
+        return self.array.coords(index) if index != -1 else None
+
+    def set_cell(self, x: int, y: int, cell_id: int) -> None:
+        """
+        Change a single cell. Use this instead of writing to self.grid directly,
+        so the cost array, player/goal positions and map validity stay up to date.
+        :param x: x coordinate of the cell
+        :param y: y coordinate of the cell
+        :param cell_id: new cell id
+        :return: None
+        """
+        old_id = self.grid[y][x]
+        if old_id == cell_id:
+            return
+        self.array.set(x, y, cell_id)
+        self.dirty_cells.add((x, y))
+        self.notify_cell_listeners([(x, y)])
+
+        # Another player/goal may still be on the map if one was painted over, so look for it
+        if old_id == c.PLAYER_ID and self.player_pos == (x, y):
+            self.player_pos = self._find_cell(c.PLAYER_ID)
+        elif old_id == c.WIFEY_ID and self.goal_pos == (x, y):
+            self.goal_pos = self._find_cell(c.WIFEY_ID)
+        if cell_id == c.PLAYER_ID:
+            self.player_pos = (x, y)
+        elif cell_id == c.WIFEY_ID:
+            self.goal_pos = (x, y)
+
+        if self.border_reachable is not None:
+            self._update_border_reachable(x, y, old_id, cell_id)
+            self.update_validity()
+
+    def update_cell(self, x: int, y: int, tool: str) -> None:
+        """
+        :param x: x coordinate of the cell
+        :param y: y coordinate of the cell
+        :param tool: what is selected on sidebar
+        :return: None
+        """
+        # Overwrite the player/goal if it is already in the game
+        if self.grid[y][x] == c.PLAYER_ID:
+            self.player_in_the_game = False
+        if self.grid[y][x] == c.WIFEY_ID:
+            self.goal_in_the_game = False
+
+        if tool == "wall":
+            self.set_cell(x, y, c.WALL_ID)
+        elif tool == "eraser":
+            self.set_cell(x, y, c.EMPTY_CELL_ID)
+        elif tool == "player" and not self.player_in_the_game:
+            self.set_cell(x, y, c.PLAYER_ID)
+            self.player_in_the_game = True
+        elif tool == "wifey" and not self.goal_in_the_game:
+            self.set_cell(x, y, c.WIFEY_ID)
+            self.goal_in_the_game = True
+        elif tool == "lava":
+            self.set_cell(x, y, c.LAVA_ID)
+        elif tool == "mountain":
+            self.set_cell(x, y, c.MOUNTAIN_ID)
+        elif tool == "hidra":  # Optional: allow placing hydra manually
+            self.set_cell(x, y, c.HIDRA_ID)
+            # Initialize hydra state
+            self.hydra_position = (x, y)
+            self.hydra_heads = 3
+
+        self.update_validity()
+
+    @instrumented_search
+    @cached_search
+    def bfs(self, start, goal):
+        """
+        Perform BFS search from start to goal.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.unweighted_search(self.array, start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    def dfs(self, start, goal):
+        """
+        Perform DFS search from start to goal.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.unweighted_search(self.array, start, goal, depth_first=True, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def ucs(self, start, goal):
+        """
+        Perform Uniform Cost Search from start to goal.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.weighted_search(self.array, start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def astar(self, start, goal):
+        """
+        Perform A* Search from start to goal using Manhattan distance heuristic.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        h = search_core.manhattan_heuristic(self.array, goal)
+        path = search_core.weighted_search(self.array, start, goal, heuristic=h, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def alt(self, start, goal):
+        """
+        Perform A* Search from start to goal using the landmark (ALT) heuristic.
+        Expands far fewer cells than A* around mountains and walls. The landmark tables
+        are computed (or loaded from c.ALT_TABLE_DIR) on the first query and kept until a cell gets cheaper.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        if self.landmark_tables is None:
+            self.landmark_tables = landmarks.LandmarkTables(self)
+        self.last_search_stats = {}
+        h = self.landmark_tables.heuristic(start, goal)
+        path = search_core.weighted_search(self.array, start, goal, heuristic=h, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    def bidirectional_bfs(self, start, goal):
+        """
+        Perform BFS from both start and goal until the two searches meet.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.bidirectional_bfs(self.array, start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def bidirectional_astar(self, start, goal):
+        """
+        Perform A* from both start and goal until no cheaper meeting point can exist.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.bidirectional_astar(self.array, start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def jps(self, start, goal):
+        """
+        Perform Jump Point Search from start to goal.
+        Finds paths as cheap as A*, expanding far fewer cells on open, uniform-cost areas.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        self.last_search_stats = {}
+        path = search_core.jump_point_search(self.array, start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    @cached_search
+    @reachable_only
+    def hpa(self, start, goal):
+        """
+        Perform hierarchical (HPA*) search from start to goal.
+        The cluster abstraction is built on the first query and then only patched where cells changed.
+        Paths are close to, but not always as cheap as, A*'s.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        if self.hpa_planner is None:
+            self.hpa_planner = hpa.HierarchicalPlanner(self)
+        self.last_search_stats = {}
+        path = self.hpa_planner.find_path(start, goal, stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    @instrumented_search
+    def dstar(self, start, goal):
+        """
+        Perform incremental D* Lite search from start to goal.
+        The planner keeps its state between calls, so after cell edits or a new start only
+        the affected part of the search is redone. A new goal starts a new planner.
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        if self.dstar_planner is None or self.dstar_planner.goal != goal:
+            if self.dstar_planner is not None:
+                self.remove_cell_listener(self.dstar_planner.cells_changed)
+            self.dstar_planner = DStarLite(self, start, goal)
+        self.dstar_planner.move_start(start)
+        self.last_search_stats = {}
+        path = self.dstar_planner.replan(stats=self.last_search_stats)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    def path_cost(self, path: Optional[List[Tuple[int, int]]]) -> float:
+        """
+        :return: cost of walking the path (entering every cell after the start), inf if there is no path
+        """
+        if not path:
+            return INF
+        costs, index = self.array.costs, self.array.index
+        return sum(costs[index(x, y)] for x, y in path[1:])
+
+    def is_reachable(self, start: Tuple[int, int], goal: Tuple[int, int]) -> bool:
+        """
+        :return: True if the weighted searches can find a path from start to goal, without searching
+        """
+        return self.components.connected(start, goal)
+
+    def distance_field(self, goal: Tuple[int, int], stats: Optional[Dict] = None) -> array:
+        """
+        Cost-to-goal of every cell, computed once per goal with Dijkstra and kept until the map changes.
+        :param goal: (x, y) tuple
+        :param stats: optional dict that receives the 'expanded' count, 0 if the field was cached
+        :return: flat array indexed like self.array.costs, inf where the goal is unreachable
+        """
+        field = self.distance_fields.get(goal)
+        if field is None:
+            field = self.distance_fields[goal] = search_core.distance_field(self.array, goal, stats=stats)
+        elif stats is not None:
+            stats['expanded'] = 0  # Cached
+        return field
+
+    def cost_to_goal(self, start: Tuple[int, int], goal: Tuple[int, int]) -> float:
+        """
+        :return: cost of the cheapest path from start to goal (without the start cell), inf if there is none
+        """
+        return search_core.start_distance(self.array, self.distance_field(goal), self.array.index(*start))
+
+    @instrumented_search
+    def field_path(self, start, goal):
+        """
+        Find the cheapest path by descending the goal's distance field.
+        Only the first query for a goal pays for the field; later ones take O(path length).
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :return: path, runtime
+        """
+        start_time = time.perf_counter()
+        path = search_core.descend_distance_field(self.array, self.distance_field(goal), start)
+        self.last_search_stats = {}
+        # Expanded = cells stepped through, the field itself is not this search's work
+        search_core.record_stats(self.last_search_stats, expanded=len(path) if path else 0, generated=0,
+                                 peak_frontier=0, peak_visited=0)
+        runtime = time.perf_counter() - start_time
+        return path, runtime
+
+    def batch_paths(self, queries: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[Dict]:
+        """
+        Answer many (start, goal) queries on this map at once, sharing search trees:
+        queries with a goal used more than once are answered from that goal's distance field,
+        the rest that share a start from one Dijkstra tree grown from it until all their goals
+        are settled, and the remaining ones by A*.
+        :param queries: list of (start, goal) pairs
+        :return: one dict per query, in order, with
+                 start, goal, path (None if unreachable), cost (inf if unreachable),
+                 method ('goal field', 'start tree' or 'A*'), group_size (queries sharing the search),
+                 expanded (cells the shared search expanded) and runtime (the search's share, seconds)
+        """
+        goal_uses = Counter(goal for _, goal in queries)
+        by_goal, by_start, single = {}, {}, []
+        start_uses = Counter(start for start, goal in queries if goal_uses[goal] == 1)
+        for number, (start, goal) in enumerate(queries):
+            if goal_uses[goal] > 1:
+                by_goal.setdefault(goal, []).append(number)
+            elif start_uses[start] > 1:
+                by_start.setdefault(start, []).append(number)
+            else:
+                single.append(number)
+
+        results = [None] * len(queries)
+
+        def record(numbers, method, paths, stats, runtime):
+            for number, path in zip(numbers, paths):
+                start, goal = queries[number]
+                results[number] = {"start": start, "goal": goal, "path": path, "cost": self.path_cost(path),
+                                   "method": method, "group_size": len(numbers),
+                                   "expanded": stats.get('expanded', 0), "runtime": runtime / len(numbers)}
+
+        for goal, numbers in by_goal.items():
+            start_time = time.perf_counter()
+            stats = {}
+            field = self.distance_field(goal, stats=stats)
+            paths = [search_core.descend_distance_field(self.array, field, queries[number][0]) for number in numbers]
+            record(numbers, 'goal field', paths, stats, time.perf_counter() - start_time)
+
+        for start, numbers in by_start.items():
+            start_time = time.perf_counter()
+            stats = {}
+            goals = [queries[number][1] for number in numbers]
+            best_cost, parents = search_core.shortest_path_tree(self.array, start, goals, stats=stats)
+            paths = []
+            for goal in goals:
+                goal_index = self.array.index(*goal)
+                reachable = best_cost[goal_index] != INF
+                paths.append(self.array.path_to_coords(search_core.reconstruct_path(parents, goal_index))
+                             if reachable else None)
+            record(numbers, 'start tree', paths, stats, time.perf_counter() - start_time)
+
+        for number in single:
+            path, runtime = self.astar(*queries[number])
+            record([number], 'A*', [path], self.last_search_stats, runtime)
+
+        return results
+
+    def _repair_connection(self, player_index: int, goal_index: int) -> None:
+        """
+        Reconnect the goal to the player by flipping the fewest impassable obstacles: a 0-1 BFS
+        where entering an impassable obstacle costs 1 and any other enterable cell 0 finds the
+        crossing with the fewest of them, which become the first passable OBSTACLE_TYPES entry
+        (empty if there is none), so the obstacle density stays the same.
+        """
+        cells, costs = self.array.cells, COST_TABLE
+        flippable = {cell_id for cell_id in c.OBSTACLE_TYPES if costs[cell_id] == INF}
+        replacement = next((cell_id for cell_id in c.OBSTACLE_TYPES if costs[cell_id] != INF), c.EMPTY_CELL_ID)
+        offsets = self.array.offsets
+        flips = {player_index: 0}
+        parents = {player_index: None}
+        frontier = deque([player_index])
+        while frontier:
+            index = frontier.popleft()
+            if index == goal_index:
+                break
+            for neighbour in (index + offset for offset in offsets):
+                cell_id = cells[neighbour]
+                weight = 1 if cell_id in flippable else 0 if costs[cell_id] != INF else None
+                if weight is None or flips.get(neighbour, INF) <= flips[index] + weight:
+                    continue
+                flips[neighbour] = flips[index] + weight
+                parents[neighbour] = index
+                if weight:
+                    frontier.append(neighbour)
+                else:
+                    frontier.appendleft(neighbour)
+        index = goal_index
+        while index is not None:
+            if cells[index] in flippable:
+                cells[index] = replacement
+            index = parents.get(index)
+
+    def _place_obstacles(self,
+                         player_pos: Tuple[int, int],
+                         goal_pos: Tuple[int, int],
+                         density: float,
+                         rng,
+                         generator: str) -> None:
+        """
+        Turn `density` of the internal cells into obstacles, keeping the goal reachable from the
+        player over cells the weighted searches can enter. Positions are drawn in one shot as a
+        sample of the free internal cells and written straight into the cell buffer.
+        Both generators check reachability with a component labeling pass. When the sample leaves
+        the goal unreachable, generator="repair" flips the fewest obstacles that reconnect it
+        (see _repair_connection), so one pass always gives a solvable map, while generator="resample"
+        draws a new sample, giving up and leaving the map without obstacles after MAX_ATTEMPTS disconnected maps.
+        """
+        if generator not in ("repair", "resample"):
+            raise ValueError(f"Unknown map generator: {generator}")
+        cells = self.array.cells
+        index = self.array.index
+        inner = self.grid_size - 2
+        player_index, goal_index = index(*player_pos), index(*goal_pos)
+        reserved = {player_index, goal_index}
+        free = [cell for y in range(1, self.grid_size - 1)
+                for cell in range(index(1, y), index(1, y) + inner)
+                if cell not in reserved]
+        num_obstacles = min(int(inner * inner * density), len(free))
+        empty_map = bytes(cells)
+
+        for _ in range(c.MAX_ATTEMPTS):
+            positions = rng.sample(free, num_obstacles)
+            types = rng.choices(c.OBSTACLE_TYPES, k=num_obstacles)
+            for position, cell_id in zip(positions, types):
+                cells[position] = cell_id
+            labels = self.array.component_labels()
+            if labels[player_index] == labels[goal_index] != 0:
+                return
+            if generator == "repair":
+                self._repair_connection(player_index, goal_index)
+                return
+            cells[:] = empty_map
+        # No path found in any attempt: keep the map without obstacles
+
+    def create_auto_map(self,
+                        player_pos: Tuple[int, int],
+                        goal_pos: Tuple[int, int],
+                        place_obstacles: bool = True,
+                        monster_enabled: bool = c.HIDRA_ENABLED,
+                        rng: Optional[random.Random] = None,
+                        density: float = c.OBSTACLE_DENSITY,
+                        generator: str = c.MAP_GENERATOR) -> None:
+        """
+        Automatically create a map with:
+        1. Walls on boundaries.
+        2. Player and goal at given positions.
+        3. Optionally place obstacles ensuring a path remains possible.
+        :param rng: random number generator to draw from, the global one if None.
+                    Pass a seeded random.Random to get the same map every time.
+        :param density: fraction of the internal cells turned into obstacles
+        :param generator: "resample" (retry until connected) or "repair" (reconnect with the fewest flips)
+        """
+        rng = rng or random
+        # Clear grid. Cells are written directly below, validation is recomputed at the end
+        self.array.fill(c.EMPTY_CELL_ID)
+        self.border_reachable = None
+        self.player_in_the_game = False
+        self.goal_in_the_game = False
+        self.monster_enabled = monster_enabled
+
+        # Place boundary walls
+        for x in range(self.grid_size):
+            self.grid[0][x] = c.WALL_ID
+            self.grid[self.grid_size - 1][x] = c.WALL_ID
+        for y in range(self.grid_size):
+            self.grid[y][0] = c.WALL_ID
+            self.grid[y][self.grid_size - 1] = c.WALL_ID
+
+        # Place player and goal
+        px, py = player_pos
+        gx, gy = goal_pos
+        self.grid[py][px] = c.PLAYER_ID
+        self.player_in_the_game = True
+        self.grid[gy][gx] = c.WIFEY_ID
+        self.goal_in_the_game = True
+
+        if place_obstacles:
+            self._place_obstacles(player_pos, goal_pos, density, rng, generator)
+        empty_cells = [(x, y) for y in range(1, self.grid_size - 1) for x in range(1, self.grid_size - 1)
+                       if self.grid[y][x] == c.EMPTY_CELL_ID] if self.monster_enabled else []
+        if empty_cells:
+            # Place Hydra in a random internal cell not occupied by player/goal/obstacle
+            hx, hy = rng.choice(empty_cells)
+            self.set_cell(hx, hy, c.HIDRA_ID)
+            # Store hydra state
+            self.hydra_position = (hx, hy)
+            self.hydra_heads = 3
+        else:
+            self.hydra_position = None
+            self.hydra_heads = 0
+
+        # Place water bottle always
+        # while True:
+        #     wx = random.randint(1, self.grid_size - 2)
+        #     wy = random.randint(1, self.grid_size - 2)
+        #     if self.grid[wy][wx] == c.EMPTY_CELL_ID:
+        #         self.grid[wy][wx] = c.WATER_ID
+        #         self.water_position = (wx, wy)
+        #         break
+
+        # Obstacles were written straight into the rows
+        self._cells_replaced()
+
+    def load_cells(self,
+                   cells,
+                   hydra_position: Optional[Tuple[int, int]] = None,
+                   hydra_heads: int = 0,
+                   monster_enabled: bool = False) -> None:
+        """
+        Replace the whole map, e.g. with one read from a map file (see map_io).
+        :param cells: grid_size * grid_size cell ids, row by row, as any bytes-like object
+        :param hydra_position: (x, y) of the hydra, None if there is none
+        :param hydra_heads: heads the hydra grew so far
+        :param monster_enabled: whether the map has a hydra
+        """
+        grid_size = self.grid_size
+        if len(cells) != grid_size * grid_size:
+            raise ValueError(f"Expected {grid_size * grid_size} cells, got {len(cells)}")
+        for y in range(grid_size):
+            start = self.array.index(0, y)
+            self.array.cells[start:start + grid_size] = cells[y * grid_size:(y + 1) * grid_size]
+        self.player_in_the_game = self.array.cells.find(bytes([c.PLAYER_ID])) != -1
+        self.goal_in_the_game = self.array.cells.find(bytes([c.WIFEY_ID])) != -1
+        self.hydra_position = hydra_position
+        self.hydra_heads = hydra_heads
+        self.monster_enabled = monster_enabled
+        self._cells_replaced()
+
+    def _cells_replaced(self) -> None:
+        """
+        Bring the costs, listeners, components and validation up to date after cells were written directly.
+        """
+        self.array.refresh_costs()
+        self.border_reachable = None
+        self.notify_cell_listeners(None)
+        # Label the new map now rather than inside the first search, which would time it
+        self.components.rebuild()
+        self.update_violating_cells()
@@ -0,0 +1,351 @@
+"""
+Hierarchical pathfinding (HPA*) for large grids.
+
+The map is cut into square clusters of HPA_CLUSTER_SIZE cells. Where two
+neighbouring clusters touch, every run of open cell pairs across their border
+is an entrance, and each piece of at most HPA_ENTRANCE_WIDTH cells of a run
+gets one transition: its cheapest pair of cells. The transition cells are the
+nodes of an abstract graph. Two transitions of the same cluster are joined by
+the cost of the cheapest path between them that stays inside the cluster, and
+the two cells of a transition by the cost of stepping across the border.
+
+A query links start and goal to the transitions of their own clusters, runs A*
+on the small abstract graph and then refines every abstract edge into cells
+with a search limited to one cluster. The paths are close to, but not always
+as cheap as, the ones A* finds.
+
+The planner listens to the cell edits of its GridModel and only rebuilds the
+clusters (and borders) an edit touched, the next time it is queried.
+"""
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+import custom_constants as c
+from grid_array import INF
+from search_core import NO_PARENT, record_stats
+
+Cluster = Tuple[int, int]
+
+
+class HierarchicalPlanner:
+    """
+    Cluster abstraction of a GridModel, kept up to date through its cell listeners.
+    """
+
+    def __init__(self, grid_model, cluster_size: int = c.HPA_CLUSTER_SIZE,
+                 entrance_width: int = c.HPA_ENTRANCE_WIDTH):
+        """
+        :param grid_model: GridModel to plan on
+        :param cluster_size: side length of a cluster in cells
+        :param entrance_width: longest piece of an entrance that gets a single transition
+        """
+        self.grid_model = grid_model
+        self.array = grid_model.array
+        self.cluster_size = cluster_size
+        self.entrance_width = entrance_width
+        self.clusters_per_side = -(-grid_model.grid_size // cluster_size)
+
+        # Transition pairs (cell in the first cluster, cell in the second) of every border,
+        # keyed by the pair of clusters, the left/upper one first
+        self.borders: Dict[Tuple[Cluster, Cluster], List[Tuple[int, int]]] = {}
+        self.cluster_nodes: Dict[Cluster, Set[int]] = {}
+        self.partners: Dict[int, Set[int]] = {}  # Transition cell -> cells across the border
+        self.edges: Dict[int, Dict[int, float]] = {}  # Transition cell -> {same-cluster transition: cost}
+
+        self.dirty_clusters: Set[Cluster] = set()
+        self.dirty_borders: Set[Tuple[Cluster, Cluster]] = set()
+        # Work counters of the current query, over the cluster searches and the abstract search
+        self.expanded = 0  # Cells and abstract nodes expanded
+        self.generated = 0
+        self.peak_frontier = 0
+        self.reopened = 0  # Cells expanded again by a later search of the same query
+        self.closed: Set[int] = set()
+        self.invalidate(None)
+        grid_model.add_cell_listener(self.invalidate)
+
+    # Geometry ___________________________
+
+    def cluster_of(self, index: int) -> Cluster:
+        x, y = self.array.coords(index)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def cluster_bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        """
+        :return: x0, y0, x1, y1 of the cluster, ends exclusive
+        """
+        cx, cy = cluster
+        grid_size = self.grid_model.grid_size
+        return (cx * self.cluster_size, cy * self.cluster_size,
+                min(grid_size, (cx + 1) * self.cluster_size), min(grid_size, (cy + 1) * self.cluster_size))
+
+    def open_cells(self, cluster: Cluster) -> Set[int]:
+        """
+        :return: flat indices of the passable cells of the cluster
+        """
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        costs = self.array.costs
+        return {index for y in range(y0, y1) for index in range(self.array.index(x0, y), self.array.index(x1, y))
+                if costs[index] != INF}
+
+    def all_clusters(self) -> List[Cluster]:
+        return [(cx, cy) for cy in range(self.clusters_per_side) for cx in range(self.clusters_per_side)]
+
+    def cluster_borders(self, cluster: Cluster) -> List[Tuple[Cluster, Cluster]]:
+        """
+        :return: keys of the borders of the cluster with its right, bottom, left and top neighbours
+        """
+        cx, cy = cluster
+        borders = []
+        if cx + 1 < self.clusters_per_side:
+            borders.append((cluster, (cx + 1, cy)))
+        if cy + 1 < self.clusters_per_side:
+            borders.append((cluster, (cx, cy + 1)))
+        if cx > 0:
+            borders.append(((cx - 1, cy), cluster))
+        if cy > 0:
+            borders.append(((cx, cy - 1), cluster))
+        return borders
+
+    # Keeping the abstraction up to date _
+
+    def invalidate(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """
+        Cell listener: mark the clusters and borders the changed cells belong to.
+        :param cells: changed (x, y) cells, None if the whole map changed
+        """
+        if cells is None:
+            self.dirty_clusters.update(self.all_clusters())
+            for cluster in self.all_clusters():
+                self.dirty_borders.update(self.cluster_borders(cluster))
+            return
+
+        size = self.cluster_size
+        for x, y in cells:
+            cluster = (x // size, y // size)
+            self.dirty_clusters.add(cluster)
+            x0, y0, x1, y1 = self.cluster_bounds(cluster)
+            # A cell on the edge of its cluster can move the transitions of that border,
+            # which changes the nodes of the cluster on the other side as well
+            for border in self.cluster_borders(cluster):
+                first, second = border
+                other = second if first == cluster else first
+                on_edge = ((other[0] > cluster[0] and x == x1 - 1) or (other[0] < cluster[0] and x == x0)
+                           or (other[1] > cluster[1] and y == y1 - 1) or (other[1] < cluster[1] and y == y0))
+                if on_edge:
+                    self.dirty_borders.add(border)
+                    self.dirty_clusters.add(other)
+
+    def rebuild(self) -> None:
+        """
+        Recompute the transitions of the dirty borders and the edges of the dirty clusters.
+        """
+        for border in self.dirty_borders:
+            for first, second in self.borders.get(border, []):
+                self.partners.get(first, set()).discard(second)
+                self.partners.get(second, set()).discard(first)
+            self.borders[border] = self._find_transitions(*border)
+            for first, second in self.borders[border]:
+                self.partners.setdefault(first, set()).add(second)
+                self.partners.setdefault(second, set()).add(first)
+
+        for cluster in self.dirty_clusters:
+            for node in self.cluster_nodes.get(cluster, ()):
+                self.edges.pop(node, None)
+            nodes = set()
+            for first_cluster, second_cluster in self.cluster_borders(cluster):
+                side = 0 if first_cluster == cluster else 1
+                nodes.update(pair[side] for pair in self.borders[(first_cluster, second_cluster)])
+            self.cluster_nodes[cluster] = nodes
+            open_cells = self.open_cells(cluster)
+            for node in nodes:
+                cost, _ = self._cluster_search(node, cluster, open_cells=open_cells)
+                self.edges[node] = {other: cost[other] for other in nodes if other != node and other in cost}
+        for node in [node for node, partners in self.partners.items() if not partners]:
+            del self.partners[node]
+
+        self.dirty_borders.clear()
+        self.dirty_clusters.clear()
+
+    def _find_transitions(self, first: Cluster, second: Cluster) -> List[Tuple[int, int]]:
+        """
+        :return: transition pairs of the border between two neighbouring clusters
+        """
+        costs = self.array.costs
+        x0, y0, x1, y1 = self.cluster_bounds(first)
+        if second[0] > first[0]:  # Vertical border, second cluster on the right
+            pairs = [(self.array.index(x1 - 1, y), self.array.index(x1, y)) for y in range(y0, y1)]
+        else:  # Horizontal border, second cluster below
+            pairs = [(self.array.index(x, y1 - 1), self.array.index(x, y1)) for x in range(x0, x1)]
+
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and costs[pair[0]] != INF and costs[pair[1]] != INF:
+                run.append(pair)
+                continue
+            # End of a run of open pairs: one transition per piece, at the cheapest pair closest to its middle
+            for start in range(0, len(run), self.entrance_width):
+                piece = run[start:start + self.entrance_width]
+                middle = (len(piece) - 1) / 2
+                best = min(range(len(piece)),
+                           key=lambda i: (costs[piece[i][0]] + costs[piece[i][1]], abs(i - middle)))
+                transitions.append(piece[best])
+            run = []
+        return transitions
+
+    # Searches ___________________________
+
+    def _cluster_search(self, source: int, cluster: Cluster, backward: bool = False,
+                        open_cells: Optional[Set[int]] = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Dijkstra from one cell over the cells of one cluster.
+        :param backward: walk the moves backwards, giving the cost from every cell to the source
+        :param open_cells: the cluster's open_cells, if already known
+        :return: cost and predecessor of every reached cell
+        """
+        costs = self.array.costs
+        offsets = self.array.offsets
+        if open_cells is None:
+            open_cells = self.open_cells(cluster)
+
+        best_cost = {source: 0}
+        parents = {source: NO_PARENT}
+        heap = [(0, source)]
+        self.generated += 1
+        while heap:
+            cost_so_far, index = heapq.heappop(heap)
+            if cost_so_far > best_cost[index]:
+                continue
+            self._count_expansion(index)
+            for offset in offsets:
+                next_index = index + offset
+                if next_index not in open_cells:
+                    continue
+                new_cost = cost_so_far + (costs[index] if backward else costs[next_index])
+                if new_cost < best_cost.get(next_index, INF):
+                    best_cost[next_index] = new_cost
+                    parents[next_index] = index
+                    heapq.heappush(heap, (new_cost, next_index))
+                    self.generated += 1
+            self.peak_frontier = max(self.peak_frontier, len(heap))
+        return best_cost, parents
+
+    def _count_expansion(self, index: int) -> None:
+        self.expanded += 1
+        if index in self.closed:
+            self.reopened += 1
+        else:
+            self.closed.add(index)
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        :param start: (x, y) tuple
+        :param goal: (x, y) tuple
+        :param stats: optional dict that receives the work counters of linking start and goal and of
+                      the abstract search (abstract nodes and cells), see search_core.STAT_FIELDS.
+                      Visited counts the cells and nodes the three searches hold at the same time.
+        :return: path or None if the goal is unreachable
+        """
+        if self.dirty_borders or self.dirty_clusters:
+            self.rebuild()
+        self.expanded = self.generated = self.peak_frontier = self.reopened = 0
+        self.closed = set()
+        array = self.array
+        start_index = array.index(*start)
+        goal_index = array.index(*goal)
+        start_cluster = self.cluster_of(start_index)
+        goal_cluster = self.cluster_of(goal_index)
+
+        # Link start and goal to the transitions of their clusters (and to each other if they share one)
+        from_start, start_parents = self._cluster_search(start_index, start_cluster)
+        to_goal, goal_children = self._cluster_search(goal_index, goal_cluster, backward=True)
+        start_edges = {node: from_start[node] for node in self.cluster_nodes[start_cluster] if node in from_start}
+        if goal_index in from_start:
+            start_edges[goal_index] = from_start[goal_index]
+        goal_edges = {node: to_goal[node] for node in self.cluster_nodes[goal_cluster] if node in to_goal}
+
+        abstract_path, abstract_visited = self._abstract_search(start_index, goal_index, start_edges, goal_edges)
+        record_stats(stats, self.expanded, self.generated, self.peak_frontier,
+                     len(from_start) + len(to_goal) + abstract_visited, self.reopened)
+        if abstract_path is None:
+            return None
+        return array.path_to_coords(self._refine(abstract_path, start_parents, goal_children))
+
+    def _abstract_search(self, start_index: int, goal_index: int,
+                         start_edges: Dict[int, float],
+                         goal_edges: Dict[int, float]) -> Tuple[Optional[List[int]], int]:
+        """
+        A* over the transitions, with start and goal linked in.
+        :return: abstract path start -> transitions -> goal (None if there is none), nodes visited
+        """
+        if start_index == goal_index:
+            return [start_index], 1
+        costs = self.array.costs
+        width = self.array.width
+        goal_row, goal_col = divmod(goal_index, width)
+
+        def h(index: int) -> int:
+            row, col = divmod(index, width)
+            return abs(col - goal_col) + abs(row - goal_row)
+
+        best_cost = {start_index: 0}
+        parents = {start_index: NO_PARENT}
+        heap = [(h(start_index), 0, start_index)]
+        self.generated += 1
+        while heap:
+            _, cost_so_far, index = heapq.heappop(heap)
+            if index == goal_index:
+                path = []
+                while index != NO_PARENT:
+                    path.append(index)
+                    index = parents[index]
+                return path[::-1], len(best_cost)
+            if cost_so_far > best_cost[index]:
+                continue
+            self._count_expansion(index)
+
+            # The start is linked to its cluster by start_edges, other cells by the precomputed edges
+            neighbours = list(start_edges.items() if index == start_index else self.edges.get(index, {}).items())
+            neighbours += [(partner, costs[partner]) for partner in self.partners.get(index, ())]
+            if index != start_index and index in goal_edges:
+                neighbours.append((goal_index, goal_edges[index]))
+            for next_index, step_cost in neighbours:
+                new_cost = cost_so_far + step_cost
+                if new_cost < best_cost.get(next_index, INF):
+                    best_cost[next_index] = new_cost
+                    parents[next_index] = index
+                    heapq.heappush(heap, (new_cost + h(next_index), new_cost, next_index))
+                    self.generated += 1
+            self.peak_frontier = max(self.peak_frontier, len(heap))
+        return None, len(best_cost)
+
+    def _refine(self, abstract_path: List[int], start_parents: Dict[int, int],
+                goal_children: Dict[int, int]) -> List[int]:
+        """
+        Turn an abstract path into cells, one cluster-limited search per intra-cluster edge.
+        """
+        path = [abstract_path[0]]
+        last = len(abstract_path) - 1
+        for step, (source, target) in enumerate(zip(abstract_path, abstract_path[1:]), start=1):
+            if target in self.partners.get(source, ()):
+                path.append(target)  # Crossing a border
+                continue
+            if step == last:
+                # Into the goal: follow the backward search from the goal
+                index = goal_children[source]
+                while index != NO_PARENT:
+                    path.append(index)
+                    index = goal_children[index]
+                continue
+            if step == 1:
+                parents = start_parents
+            else:
+                _, parents = self._cluster_search(source, self.cluster_of(source))
+            segment = []
+            index = target
+            while index != source:
+                segment.append(index)
+                index = parents[index]
+            path.extend(reversed(segment))
+        return path
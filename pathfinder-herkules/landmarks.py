@@ -0,0 +1,224 @@
+"""
+Landmark (ALT) heuristic for A*.
+
+A few landmark cells are picked per map, and two distance tables are computed
+for each landmark L: d(L, v) from it to every cell and d(v, L) from every cell
+to it (entering a cell is what costs, so the two differ). By the triangle
+inequality, for any cell v and goal t
+
+    d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+
+so the largest of these bounds over the landmarks is an admissible, consistent
+heuristic. Unlike the Manhattan distance it knows about mountains and the
+detours around walls and lava.
+
+Landmarks are picked by farthest-point selection: each new one is the cell
+farthest from all the landmarks picked so far, which spreads them out to the
+edges of the map, where their bounds are tightest. A query only uses the
+ALT_ACTIVE_LANDMARKS landmarks with the best bound at its start.
+
+The tables stay valid while cells only get more expensive: the bounds were
+computed on a cheaper map, so they still underestimate. They are dropped as
+soon as a cell gets cheaper. Tables can also be saved per map, keyed by the
+grid fingerprint, so the next session on the same map skips the Dijkstras.
+"""
+import os
+import struct
+from array import array
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import custom_constants as c
+import search_core
+from grid_array import COST_TABLE, INF
+
+# File header: magic, grid size, landmark count, grid fingerprint, table typecode.
+# The tables follow in native byte order, the files are a per-machine cache.
+HEADER = struct.Struct('<4sIIQc')
+MAGIC = b'ALT1'
+# Distances are sums of integer cell costs, which float32 stores exactly below 2 ** 24
+FLOAT32_EXACT = 2 ** 24
+
+
+class LandmarkTables:
+    """
+    Landmark distance tables of a GridModel, dropped through its cell listeners when they become invalid.
+    """
+
+    def __init__(self, grid_model, count: int = c.ALT_LANDMARKS, active: int = c.ALT_ACTIVE_LANDMARKS,
+                 table_dir: Optional[str] = c.ALT_TABLE_DIR):
+        """
+        :param grid_model: GridModel to compute the tables for
+        :param count: landmarks to pick
+        :param active: landmarks a query uses
+        :param table_dir: directory to load the tables of a map from and save them to, None to only keep them in memory
+        """
+        self.array = grid_model.array
+        self.count = count
+        self.active = active
+        self.table_dir = table_dir
+        self.landmarks: List[int] = []  # Flat indices
+        self.forward: List[array] = []  # d(L, v) per landmark
+        self.backward: List[array] = []  # d(v, L) per landmark
+        self.fingerprint = None  # Fingerprint of the map the tables were computed on, None = no tables
+        self.built_cells = None  # Cell ids the tables were computed on, to tell which edits make a cell cheaper
+        self.builds = 0  # Tables computed so far (loaded ones not included)
+        grid_model.add_cell_listener(self.cells_changed)
+
+    def clear(self) -> None:
+        self.landmarks, self.forward, self.backward = [], [], []
+        self.fingerprint = self.built_cells = None
+
+    def build(self, stats: Optional[Dict] = None) -> None:
+        """
+        Pick the landmarks in the largest component and compute their tables.
+        :param stats: optional dict that receives the 'expanded' count of all the Dijkstras
+        """
+        self.clear()
+        grid = self.array
+        expanded = 0
+        labels = grid.component_labels()
+        sizes = Counter(labels)
+        sizes.pop(0, None)
+        if sizes:
+            # The first landmark is the cell farthest from an arbitrary cell of the component,
+            # every next one the cell farthest from the landmarks so far. Other cells stay at -1.
+            seed = labels.index(sizes.most_common(1)[0][0])
+            dijkstra_stats = {}
+            nearest = [-1.0 if cost == INF else cost
+                       for cost in search_core.cost_field(grid, grid.coords(seed), stats=dijkstra_stats)]
+            expanded += dijkstra_stats['expanded']
+            for _ in range(self.count):
+                farthest = max(nearest)
+                if farthest <= 0:
+                    break  # Every cell of the component is a landmark already
+                landmark = nearest.index(farthest)
+                forward = search_core.cost_field(grid, grid.coords(landmark), stats=dijkstra_stats)
+                expanded += dijkstra_stats['expanded']
+                backward = search_core.distance_field(grid, grid.coords(landmark), stats=dijkstra_stats)
+                expanded += dijkstra_stats['expanded']
+                self.landmarks.append(landmark)
+                self.forward.append(forward)
+                self.backward.append(backward)
+                nearest = list(map(min, nearest, forward))
+
+        # Store the tables as float32 when that is exact, which halves their size
+        if sum(cost for cost in grid.costs if cost != INF) < FLOAT32_EXACT:
+            self.forward = [array('f', table) for table in self.forward]
+            self.backward = [array('f', table) for table in self.backward]
+        self.fingerprint = grid.fingerprint
+        self.built_cells = bytes(grid.cells)
+        self.builds += 1
+        if stats is not None:
+            stats['expanded'] = expanded
+
+    def prepare(self) -> None:
+        """
+        Make sure there are tables: load the ones saved for this map, or compute (and save) them.
+        """
+        if self.fingerprint is not None:
+            return
+        if self.table_dir is not None and self.load(self.table_path()):
+            return
+        self.build()
+        if self.table_dir is not None:
+            os.makedirs(self.table_dir, exist_ok=True)
+            self.save(self.table_path())
+
+    def table_path(self) -> str:
+        """
+        :return: file the tables of the current map are saved to
+        """
+        return os.path.join(self.table_dir, f"{self.array.grid_size}-{self.array.fingerprint:016x}.alt")
+
+    def heuristic(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Callable[[int], float]:
+        """
+        :return: h(index) giving the best landmark bound on the cost from a flat index to the goal,
+                 never below the Manhattan distance
+        """
+        self.prepare()
+        start_index, goal_index = self.array.index(*start), self.array.index(*goal)
+        manhattan = search_core.manhattan_heuristic(self.array, goal)
+        candidates = []
+        for forward, backward in zip(self.forward, self.backward):
+            to_goal, from_goal = forward[goal_index], backward[goal_index]
+            if to_goal == INF:
+                continue  # Landmark in another component, it bounds nothing
+            start_bound = max(to_goal - forward[start_index], backward[start_index] - from_goal)
+            candidates.append((start_bound, forward, to_goal, backward, from_goal))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        active = [candidate[1:] for candidate in candidates[:self.active]]
+
+        def h(index: int) -> float:
+            best = manhattan(index)
+            for forward, to_goal, backward, from_goal in active:
+                bound = to_goal - forward[index]
+                if bound > best:
+                    best = bound
+                bound = backward[index] - from_goal
+                if bound > best:
+                    best = bound
+            return best
+
+        return h
+
+    def cells_changed(self, cells: Optional[List[Tuple[int, int]]]) -> None:
+        """
+        Cell listener: drop the tables once a cell got cheaper than it was when they were computed.
+        :param cells: changed (x, y) cells, None if the whole map changed
+        """
+        if self.built_cells is None:
+            return
+        if cells is None:
+            self.clear()
+            return
+        grid = self.array
+        for x, y in cells:
+            index = grid.index(x, y)
+            if COST_TABLE[grid.cells[index]] < COST_TABLE[self.built_cells[index]]:
+                self.clear()
+                return
+
+    def save(self, path: str) -> None:
+        typecode = self.forward[0].typecode if self.forward else 'f'
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.array.grid_size, len(self.landmarks), self.fingerprint,
+                                typecode.encode()))
+            f.write(array('i', self.landmarks).tobytes())
+            for table in self.forward + self.backward:
+                f.write(table.tobytes())
+
+    def load(self, path: str) -> bool:
+        """
+        Load saved tables, if they were computed on the current map.
+        :return: True if the tables were loaded, False if the file is missing or belongs to another map
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        if len(data) < HEADER.size:
+            return False
+        magic, grid_size, count, fingerprint, typecode = HEADER.unpack_from(data)
+        if magic != MAGIC or grid_size != self.array.grid_size or fingerprint != self.array.fingerprint:
+            return False
+
+        landmarks, table = array('i'), array(typecode.decode())
+        cells = len(self.array.costs)
+        if len(data) != HEADER.size + count * landmarks.itemsize + 2 * count * cells * table.itemsize:
+            return False  # Truncated file
+        offset = HEADER.size + count * landmarks.itemsize
+        landmarks.frombytes(data[HEADER.size:offset])
+        tables = []
+        for _ in range(2 * count):
+            table = array(table.typecode)
+            table.frombytes(data[offset:offset + cells * table.itemsize])
+            offset += cells * table.itemsize
+            tables.append(table)
+
+        self.landmarks = landmarks.tolist()
+        self.forward, self.backward = tables[:count], tables[count:]
+        self.fingerprint = fingerprint
+        self.built_cells = bytes(self.array.cells)
+        return True
@@ -1,39 +1,54 @@
 import random
-import time
-import csv
-import os
-from create_map import Grid
-from custom_constants import WALL_ID, HIDRA_ID, LAVA_ID, CELL_COSTS
+from grid_model import GridModel
+from grid_array import GridArray
+from custom_constants import HIDRA_ID, LAVA_ID, EXPERIMENT_SEED, EXPERIMENT_WORKERS
+from experiments import derive_seeds
+from results_sink import LOCAL_SEARCH_COLUMNS, ResultsSink
+import search_core
 
 class LocalSearch:
-    def __init__(self, grid):
+    def __init__(self, grid, use_distance_field=False):
         """
         :param grid: The Grid object from your main code that provides
-                     environment info: grid.grid[y][x] and grid_size, etc.
+                     environment info: grid.grid[y][x] and grid_size, etc.,
+                     or directly its array-backed GridArray.
+        :param use_distance_field: use the goal's distance field (the exact remaining cost)
+                     as the heuristic instead of the Manhattan distance
         """
-        self.grid = grid
+        self.grid_model = None if isinstance(grid, GridArray) else grid
+        self.array = grid if isinstance(grid, GridArray) else grid.array
         self.grid_size = grid.grid_size
+        self.use_distance_field = use_distance_field
+        self.distance_fields = {}
+
+    def distance_field(self, goal):
+        # The Grid caches its fields until the map changes, a bare GridArray gets one per goal here
+        if self.grid_model is not None:
+            return self.grid_model.distance_field(goal)
+        if goal not in self.distance_fields:
+            self.distance_fields[goal] = search_core.distance_field(self.array, goal)
+        return self.distance_fields[goal]
 
     def heuristic(self, x, y, goal):
+        if self.use_distance_field:
+            # Perfect heuristic: the cost of the cheapest path to the goal (inf if there is none)
+            return self.distance_field(goal)[self.array.index(x, y)]
         # Manhattan distance heuristic
         gx, gy = goal
         return abs(x - gx) + abs(y - gy)
 
     def get_neighbors(self, x, y):
         # Return valid neighbors (passable cells only)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        # The array has a wall border, so no bounds checks are needed
         neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size:
-                cell_id = self.grid.grid[ny][nx]
-                # Check if cell is impassable or fatal
-                # If it's lava or hydra cell, stepping here = death = fail
-                cost = CELL_COSTS.get(cell_id, 1)
-                # We consider these impassable or fatal:
-                if cost == float('inf'):
-                    continue
-                neighbors.append((nx, ny))
+        costs = self.array.costs
+        index = self.array.index(x, y)
+        for offset in self.array.offsets:
+            # Lava and hydra cells cost inf like walls: stepping there = death = fail,
+            # so we consider them impassable or fatal
+            if costs[index + offset] == float('inf'):
+                continue
+            neighbors.append(self.array.coords(index + offset))
         return neighbors
 
     def hill_climbing(self, start, goal, max_iterations=1000):
@@ -71,8 +86,7 @@ class LocalSearch:
                 return None
             else:
                 # Check if this best_neighbor is a lava/hydra cell
-                nx, ny = best_neighbor
-                cell_id = self.grid.grid[ny][nx]
+                cell_id = self.array.cell(*best_neighbor)
                 if cell_id == HIDRA_ID or cell_id == LAVA_ID:
                     # Stepping here = death, immediate fail
                     return None
@@ -94,57 +108,90 @@ class LocalSearch:
         return None
 
 
-def run_tests(runs=50, maps_per_run=100, grid_size=20, output_file="local_search_results.csv"):
+def run_local_search_batch(run_index, seed, maps_per_run=100, grid_size=20, use_distance_field=False):
     """
-    Runs the local search test `runs` times. Each run generates `maps_per_run` maps.
+    One test run: generate `maps_per_run` maps from the run's own seed and try local search on each.
     For each map, we:
       - create a map
       - run local search
       - consider success if we reach the goal, failure otherwise
+    :return: run_index, successes, failures, total path length of the successful runs
+    """
+    rng = random.Random(seed)
+    successes = 0
+    failures = 0
+    total_path_length = 0
+
+    for _ in range(maps_per_run):
+        g = GridModel(grid_size)
+        px = rng.randint(1, grid_size - 2)
+        py = rng.randint(1, grid_size - 2)
+        gx = rng.randint(1, grid_size - 2)
+        gy = rng.randint(1, grid_size - 2)
+        while (gx, gy) == (px, py):
+            gx = rng.randint(1, grid_size - 2)
+            gy = rng.randint(1, grid_size - 2)
+
+        g.create_auto_map((px, py), (gx, gy), place_obstacles=True, rng=rng)
+
+        # If map isn't valid, treat as failure
+        # Validity means player and goal are enclosed properly
+        if not g.valid_map:
+            failures += 1
+            continue
+
+        ls = LocalSearch(g, use_distance_field=use_distance_field)
+        ls_path = ls.local_search_with_restarts((px, py), (gx, gy), restarts=5)
+        if ls_path is not None:
+            # Success
+            successes += 1
+            total_path_length += len(ls_path)
+        else:
+            # Failure
+            failures += 1
+
+    return run_index, successes, failures, total_path_length
+
+
+def write_batches(sink, batches, maps_per_run):
+    """
+    Write one results row per finished run, in run order, as the runs come in.
+    """
+    for run_index, successes, failures, total_path_length in batches:
+        success_rate = successes * 100.0 / maps_per_run
+        # nan, not 0: a run without successes has no path length
+        avg_path_length = total_path_length / successes if successes else float('nan')
+        sink.write((run_index, maps_per_run, successes, failures, success_rate, avg_path_length))
+
+
+def run_tests(runs=50, maps_per_run=100, grid_size=20, output_file="local_search_results.csv",
+              workers=EXPERIMENT_WORKERS, seed=EXPERIMENT_SEED, use_distance_field=False):
+    """
+    Runs the local search test `runs` times. Each run generates `maps_per_run` maps.
     At the end of each run, we record how many times local search succeeded out of `maps_per_run`.
 
-    The results are saved in a CSV file for further analysis.
+    Runs are spread over `workers` processes (None = one per CPU, 1 = in this process).
+    Every run gets its own seed derived from `seed`, so the success rates are reproducible
+    and don't depend on the number of workers.
+
+    With use_distance_field, hill climbing follows the goal's distance field instead of the
+    Manhattan distance, which always reaches the goal when it is reachable.
+
+    The results are saved through a ResultsSink for further analysis, so output_file may also be
+    .npz or .parquet. Success_Rate is a number of percent, e.g. 29.0.
     """
-    # Prepare CSV file
-    write_header = not os.path.exists(output_file)
-    with open(output_file, "a", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        if write_header:
-            writer.writerow(["Run_Number", "Maps_Per_Run", "Successes", "Failures", "Success_Rate"])
-
-        for run_index in range(1, runs + 1):
-            successes = 0
-            failures = 0
-
-            for _ in range(maps_per_run):
-                g = Grid(grid_size)
-                px = random.randint(1, grid_size - 2)
-                py = random.randint(1, grid_size - 2)
-                gx = random.randint(1, grid_size - 2)
-                gy = random.randint(1, grid_size - 2)
-                while (gx, gy) == (px, py):
-                    gx = random.randint(1, grid_size - 2)
-                    gy = random.randint(1, grid_size - 2)
-
-                g.create_auto_map((px, py), (gx, gy), place_obstacles=True)
-
-                # If map isn't valid, treat as failure
-                # Validity means player and goal are enclosed properly
-                if not g.valid_map:
-                    failures += 1
-                    continue
-
-                ls = LocalSearch(g)
-                ls_path = ls.local_search_with_restarts((px, py), (gx, gy), restarts=5)
-                if ls_path is not None:
-                    # Success
-                    successes += 1
-                else:
-                    # Failure
-                    failures += 1
-
-            success_rate = (successes / maps_per_run) * 100.0
-            writer.writerow([run_index, maps_per_run, successes, failures, f"{success_rate:.2f}%"])
+    run_indices = list(range(1, runs + 1))
+    run_seeds = derive_seeds(seed, runs)
+    batch_args = (run_indices, run_seeds, [maps_per_run] * runs, [grid_size] * runs, [use_distance_field] * runs)
+
+    with ResultsSink(output_file, columns=LOCAL_SEARCH_COLUMNS) as sink:
+        if workers == 1:
+            write_batches(sink, map(run_local_search_batch, *batch_args), maps_per_run)
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # Imported here, it is slow to import for serial runs
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                write_batches(sink, executor.map(run_local_search_batch, *batch_args), maps_per_run)
 
     print(f"Test completed. Results saved to {output_file}")
 
@@ -0,0 +1,173 @@
+"""
+Binary map files.
+
+A map is stored as one fixed-size little-endian header followed by its raw
+cell ids, grid_size * grid_size bytes row by row:
+
+    magic "HMAP", version, flags (1 = hydra enabled), grid size, seed (-1 if unknown),
+    player x/y, goal x/y, hydra x/y (-1 when absent), hydra heads
+
+A corpus file is any number of such records back to back, a single map file
+being a corpus of one. Files are read through mmap: opening one parses only
+the header, the cells are a zero-copy view of the file, and a corpus is
+walked record by record without ever being read as a whole. Only building a
+GridModel from a record copies the cells.
+"""
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from grid_model import GridModel
+
+HEADER = struct.Struct('<4sBBxxIqiiiiiii')
+MAGIC = b'HMAP'
+VERSION = 1
+HYDRA_ENABLED = 1
+NO_POSITION = (-1, -1)
+
+
+class MapRecord:
+    """
+    One map of a file: the header fields, and the cells as a view into the file.
+    """
+
+    def __init__(self, buffer, offset: int = 0):
+        """
+        :param buffer: bytes-like object holding the file, e.g. an mmap
+        :param offset: where the record starts
+        """
+        if len(buffer) - offset < HEADER.size:
+            raise ValueError(f"Truncated map header at offset {offset}")
+        (magic, version, flags, grid_size, seed,
+         px, py, gx, gy, hx, hy, hydra_heads) = HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC:
+            raise ValueError(f"Not a map record at offset {offset}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported map format version {version}")
+        self.offset = offset
+        self.grid_size = grid_size
+        self.seed = None if seed < 0 else seed
+        self.player_pos = None if (px, py) == NO_POSITION else (px, py)
+        self.goal_pos = None if (gx, gy) == NO_POSITION else (gx, gy)
+        self.hydra_position = None if (hx, hy) == NO_POSITION else (hx, hy)
+        self.hydra_heads = hydra_heads
+        self.monster_enabled = bool(flags & HYDRA_ENABLED)
+
+        start = offset + HEADER.size
+        self.end = start + grid_size * grid_size
+        if self.end > len(buffer):
+            raise ValueError(f"Truncated map cells at offset {offset}")
+        self.cells = memoryview(buffer)[start:self.end]
+
+    def cell(self, x: int, y: int) -> int:
+        return self.cells[y * self.grid_size + x]
+
+    def load_into(self, grid_model: GridModel) -> None:
+        """
+        Replace the map of a GridModel of the same size with this one.
+        """
+        if grid_model.grid_size != self.grid_size:
+            raise ValueError(f"Map is {self.grid_size} cells wide, the grid {grid_model.grid_size}")
+        grid_model.load_cells(self.cells, self.hydra_position, self.hydra_heads, self.monster_enabled)
+
+    def to_grid_model(self, grid_class=GridModel) -> GridModel:
+        """
+        :param grid_class: GridModel or a subclass taking the grid size, e.g. the pygame Grid
+        :return: new grid holding this map
+        """
+        grid = grid_class(self.grid_size)
+        self.load_into(grid)
+        return grid
+
+
+class MapFile:
+    """
+    Memory-mapped map or corpus file. Use as a context manager, the records are views into the mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            # mmap refuses empty files, an empty corpus is just an empty buffer
+            empty = os.fstat(f.fileno()).st_size == 0
+            self.buffer = b'' if empty else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self) -> "MapFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass  # A record's cells are still referenced, the mapping goes when they do
+
+    def record(self, offset: int = 0) -> MapRecord:
+        return MapRecord(self.buffer, offset)
+
+    def records(self) -> Iterator[MapRecord]:
+        """
+        Walk the records in file order. Only the headers are parsed.
+        """
+        offset = 0
+        while offset < len(self.buffer):
+            record = MapRecord(self.buffer, offset)
+            yield record
+            offset = record.end
+
+    def offsets(self) -> List[int]:
+        """
+        :return: start of every record, e.g. to hand records of one corpus to several processes
+        """
+        return [record.offset for record in self.records()]
+
+
+def write_map(f: BinaryIO, grid_model: GridModel, seed: Optional[int] = None) -> None:
+    """
+    Append one map record to an open binary file.
+    :param seed: seed the map was generated from, stored for reference
+    """
+    grid_size = grid_model.grid_size
+
+    def position(pos: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        return pos if pos is not None else NO_POSITION
+
+    flags = HYDRA_ENABLED if grid_model.monster_enabled else 0
+    f.write(HEADER.pack(MAGIC, VERSION, flags, grid_size, -1 if seed is None else seed,
+                        *position(grid_model.player_pos), *position(grid_model.goal_pos),
+                        *position(grid_model.hydra_position), grid_model.hydra_heads or 0))
+    cells, index = grid_model.array.cells, grid_model.array.index
+    for y in range(grid_size):
+        f.write(cells[index(0, y):index(0, y) + grid_size])
+
+
+def save_map(grid_model: GridModel, path: str, seed: Optional[int] = None) -> None:
+    with open(path, 'wb') as f:
+        write_map(f, grid_model, seed)
+
+
+def load_map(path: str, grid_class=GridModel) -> GridModel:
+    """
+    :return: grid holding the (first) map of the file
+    """
+    with MapFile(path) as map_file:
+        return map_file.record().to_grid_model(grid_class)
+
+
+def write_corpus(path: str, maps: Iterable[Tuple[GridModel, Optional[int]]], append: bool = False) -> int:
+    """
+    Write maps one after the other, e.g. straight from a generator, so the corpus is never held in memory.
+    :param maps: (grid, seed) pairs
+    :param append: add to an existing corpus instead of replacing it
+    :return: maps written
+    """
+    count = 0
+    with open(path, 'ab' if append else 'wb') as f:
+        for grid_model, seed in maps:
+            write_map(f, grid_model, seed)
+            count += 1
+    return count
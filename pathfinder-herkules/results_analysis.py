@@ -0,0 +1,239 @@
+"""
+Aggregates of experiment results, computed in bounded memory (needs numpy).
+
+A results file is read a chunk of rows at a time (results_sink.iter_results)
+and every chunk is folded into small per (algorithm, grid size) accumulators
+with vectorized numpy operations: row and success counts, runtime and
+expansion sums, the number of maps each algorithm was fastest on, and a
+histogram of the runtimes on fixed log-spaced bins, which the median and p95
+are read from. The memory used depends on the number of algorithms and grid
+sizes, not on the number of rows, so files with tens of millions of rows are
+summarised in a few MB. Only these aggregates go to the plots.
+
+Rows of one map are written one after the other (see experiments.search_map),
+which is what the fastest-algorithm counts rely on: the rows of the last map
+of a chunk are held back until the next chunk completes it.
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import custom_constants as c
+from results_sink import LOCAL_SEARCH_COLUMNS, RESULT_COLUMNS, iter_results
+
+LOG_MIN_RUNTIME = math.log10(c.ANALYSIS_MIN_RUNTIME)
+RUNTIME_BINS = math.ceil((math.log10(c.ANALYSIS_MAX_RUNTIME) - LOG_MIN_RUNTIME) * c.ANALYSIS_BINS_PER_DECADE)
+
+
+def runtime_bins(runtimes: np.ndarray) -> np.ndarray:
+    """
+    :return: histogram bin of every runtime, runtimes out of the bounds going to the first or last bin
+    """
+    logs = np.log10(np.maximum(runtimes, c.ANALYSIS_MIN_RUNTIME))
+    bins = ((logs - LOG_MIN_RUNTIME) * c.ANALYSIS_BINS_PER_DECADE).astype(np.int64)
+    return np.clip(bins, 0, RUNTIME_BINS - 1)
+
+
+def histogram_quantile(histogram: np.ndarray, fraction: float) -> float:
+    """
+    :return: nearest-rank quantile of the runtimes counted in a histogram, as the geometric middle of its bin
+    """
+    total = histogram.sum()
+    if total == 0:
+        return math.nan
+    rank = max(1, math.ceil(fraction * total))
+    index = int(np.searchsorted(np.cumsum(histogram), rank))
+    return 10 ** (LOG_MIN_RUNTIME + (index + 0.5) / c.ANALYSIS_BINS_PER_DECADE)
+
+
+class ResultsSummary:
+    """
+    Running aggregates of experiment results, fed a chunk of rows at a time with add().
+    Call finish() after the last chunk.
+    """
+
+    def __init__(self, algorithms: Optional[Sequence[str]] = None):
+        """
+        :param algorithms: only aggregate (and compare the runtimes of) these algorithms, None for all of them
+        """
+        self.selected = None if algorithms is None else set(algorithms)
+        self.algorithms: List[str] = []  # In order of appearance
+        self.algorithm_codes: Dict[str, int] = {}
+        self.groups: List[tuple] = []  # (algorithm, grid size) per group
+        self.group_codes: Dict[tuple, int] = {}
+        # Per group accumulators, grown as groups appear
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.found = np.zeros(0, dtype=np.int64)
+        self.fastest = np.zeros(0, dtype=np.int64)
+        self.runtime_sum = np.zeros(0)
+        self.expansions_sum = np.zeros(0)
+        self.runtime_min = np.zeros(0)
+        self.runtime_max = np.zeros(0)
+        self.histograms = np.zeros((0, RUNTIME_BINS), dtype=np.int64)
+        # Rows of the map the last chunk ended on: run numbers, groups, runtimes
+        self.pending = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+        self.maps = 0
+
+    def group_indices(self, algorithms: np.ndarray, grid_sizes: np.ndarray) -> np.ndarray:
+        """
+        :return: group of every row, new groups being added to the accumulators
+        """
+        names, name_rows = np.unique(algorithms, return_inverse=True)
+        for name in names.tolist():
+            if name not in self.algorithm_codes:
+                self.algorithm_codes[name] = len(self.algorithms)
+                self.algorithms.append(name)
+        codes = np.array([self.algorithm_codes[name] for name in names.tolist()], dtype=np.int64)[name_rows]
+
+        # One key per (algorithm, grid size), so the chunk's groups are found with a single np.unique
+        keys, key_rows = np.unique(codes << 32 | grid_sizes, return_inverse=True)
+        for key in keys.tolist():
+            group = (self.algorithms[key >> 32], key & 0xFFFFFFFF)
+            if group not in self.group_codes:
+                self.group_codes[group] = len(self.groups)
+                self.groups.append(group)
+        self.grow(len(self.groups))
+        lookup = np.array([self.group_codes[(self.algorithms[key >> 32], key & 0xFFFFFFFF)]
+                           for key in keys.tolist()], dtype=np.int64)
+        return lookup[key_rows]
+
+    def grow(self, groups: int) -> None:
+        added = groups - len(self.rows)
+        if added <= 0:
+            return
+        for name in ("rows", "found", "fastest"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(added, dtype=np.int64)]))
+        for name in ("runtime_sum", "expansions_sum"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(added)]))
+        self.runtime_min = np.concatenate([self.runtime_min, np.full(added, math.inf)])
+        self.runtime_max = np.concatenate([self.runtime_max, np.full(added, -math.inf)])
+        self.histograms = np.concatenate([self.histograms, np.zeros((added, RUNTIME_BINS), dtype=np.int64)])
+
+    def add(self, chunk: Dict[str, Sequence]) -> None:
+        """
+        Fold a chunk of rows (column name -> values, see results_sink.iter_results) into the aggregates.
+        """
+        algorithms = np.asarray(chunk["algorithm"])
+        runs = np.asarray(chunk["run"], dtype=np.int64)
+        grid_sizes = np.asarray(chunk["grid_size"], dtype=np.int64)
+        runtimes = np.asarray(chunk["runtime"], dtype=np.float64)
+        expansions = np.asarray(chunk["expansions"], dtype=np.float64)
+        path_steps = np.asarray(chunk["path_steps"], dtype=np.int64)
+        if self.selected is not None:
+            keep = np.isin(algorithms, list(self.selected))
+            algorithms, runs, grid_sizes = algorithms[keep], runs[keep], grid_sizes[keep]
+            runtimes, expansions, path_steps = runtimes[keep], expansions[keep], path_steps[keep]
+        if len(runs) == 0:
+            return
+
+        groups = self.group_indices(algorithms, grid_sizes)
+        count = len(self.groups)
+        self.rows += np.bincount(groups, minlength=count)
+        self.found += np.bincount(groups, weights=path_steps >= 0, minlength=count).astype(np.int64)
+        self.runtime_sum += np.bincount(groups, weights=runtimes, minlength=count)
+        self.expansions_sum += np.bincount(groups, weights=expansions, minlength=count)
+        np.minimum.at(self.runtime_min, groups, runtimes)
+        np.maximum.at(self.runtime_max, groups, runtimes)
+        self.histograms += np.bincount(groups * RUNTIME_BINS + runtime_bins(runtimes),
+                                       minlength=count * RUNTIME_BINS).reshape(count, RUNTIME_BINS)
+
+        # Fastest algorithms: the pending rows complete the first map, the last map waits for the next chunk
+        pending_runs, pending_groups, pending_runtimes = self.pending
+        runs = np.concatenate([pending_runs, runs])
+        groups = np.concatenate([pending_groups, groups])
+        runtimes = np.concatenate([pending_runtimes, runtimes])
+        last = np.flatnonzero(runs != runs[-1])
+        split = last[-1] + 1 if len(last) else 0
+        self.pending = (runs[split:], groups[split:], runtimes[split:])
+        self.count_fastest(runs[:split], groups[:split], runtimes[:split])
+
+    def count_fastest(self, runs: np.ndarray, groups: np.ndarray, runtimes: np.ndarray) -> None:
+        """
+        Count the fastest algorithm(s) of every map in rows holding whole maps. Ties count for every tied algorithm.
+        """
+        if len(runs) == 0:
+            return
+        starts = np.flatnonzero(np.concatenate([[True], runs[1:] != runs[:-1]]))
+        fastest_runtimes = np.repeat(np.minimum.reduceat(runtimes, starts), np.diff(np.append(starts, len(runs))))
+        self.fastest += np.bincount(groups[runtimes == fastest_runtimes], minlength=len(self.groups))
+        self.maps += len(starts)
+
+    def finish(self) -> "ResultsSummary":
+        """
+        Count the map the last chunk ended on.
+        """
+        self.count_fastest(*self.pending)
+        self.pending = (self.pending[0][:0], self.pending[1][:0], self.pending[2][:0])
+        return self
+
+    def fastest_counts(self) -> Dict[str, int]:
+        """
+        :return: algorithm -> number of maps it was (one of) the fastest on
+        """
+        counts = dict.fromkeys(self.algorithms, 0)
+        for (algorithm, _), fastest in zip(self.groups, self.fastest.tolist()):
+            counts[algorithm] += fastest
+        return counts
+
+    def table(self) -> List[Dict]:
+        """
+        :return: one row per (algorithm, grid size), sorted by both: runs, mean / median / p95 runtime (seconds),
+                 mean expansions, success rate (percent of maps the algorithm found a path on) and fastest count
+        """
+        table = []
+        for group in sorted(range(len(self.groups)), key=lambda group: self.groups[group]):
+            algorithm, grid_size = self.groups[group]
+            rows = int(self.rows[group])
+            histogram = self.histograms[group]
+            # The quantiles are clamped to the observed extremes, which makes them exact for a single runtime
+            low, high = self.runtime_min[group], self.runtime_max[group]
+            table.append({
+                "algorithm": algorithm,
+                "grid_size": grid_size,
+                "runs": rows,
+                "mean_runtime": float(self.runtime_sum[group] / rows),
+                "median_runtime": float(min(max(histogram_quantile(histogram, 0.5), low), high)),
+                "p95_runtime": float(min(max(histogram_quantile(histogram, 0.95), low), high)),
+                "mean_expansions": float(self.expansions_sum[group] / rows),
+                "success_rate": float(100.0 * self.found[group] / rows),
+                "fastest": int(self.fastest[group]),
+            })
+        return table
+
+
+def summarize_results(path: str = "results.csv", algorithms: Optional[Sequence[str]] = None,
+                      chunk_rows: int = c.ANALYSIS_CHUNK_ROWS) -> ResultsSummary:
+    """
+    Aggregate a results file of experiments.run_experiments (.csv, .npz or .parquet) chunk by chunk.
+    :param algorithms: only aggregate these algorithms, None for all of them
+    :param chunk_rows: rows read and aggregated at a time
+    """
+    summary = ResultsSummary(algorithms)
+    for chunk in iter_results(path, RESULT_COLUMNS, chunk_rows):
+        summary.add(chunk)
+    return summary.finish()
+
+
+def summarize_local_search(path: str = "local_search_results.csv",
+                           chunk_rows: int = c.ANALYSIS_CHUNK_ROWS) -> Dict[str, np.ndarray]:
+    """
+    Read the results of local_search.run_tests once.
+    :return: "Run_Number" and "Success_Rate" (percent) per run, "average_success_rate" over the runs
+             and "overall_success_rate" over all the maps
+    """
+    runs, rates = [], []
+    maps = successes = 0
+    for chunk in iter_results(path, LOCAL_SEARCH_COLUMNS, chunk_rows):
+        runs.append(np.asarray(chunk["Run_Number"], dtype=np.int64))
+        rates.append(np.asarray(chunk["Success_Rate"], dtype=np.float64))
+        maps += int(np.sum(np.asarray(chunk["Maps_Per_Run"], dtype=np.int64)))
+        successes += int(np.sum(np.asarray(chunk["Successes"], dtype=np.int64)))
+    run_numbers = np.concatenate(runs) if runs else np.zeros(0, dtype=np.int64)
+    success_rates = np.concatenate(rates) if rates else np.zeros(0)
+    return {
+        "Run_Number": run_numbers,
+        "Success_Rate": success_rates,
+        "average_success_rate": float(success_rates.mean()) if len(success_rates) else math.nan,
+        "overall_success_rate": 100.0 * successes / maps if maps else math.nan,
+    }
@@ -0,0 +1,232 @@
+"""
+Typed, buffered results files.
+
+Experiment rows are written through a ResultsSink: rows are buffered and
+written out every `flush_every` rows, and every column has a fixed type, so
+the files hold plain numbers (no "29.00%" strings) and are read back without
+any cleaning. The file format follows the extension:
+
+- .csv: one row per line, readable anywhere
+- .npz: one numpy array per column, written when the sink is closed (needs numpy)
+- .parquet: one row group per flush (needs pyarrow)
+
+The binary formats load millions of rows in a fraction of the time CSV takes.
+"""
+import csv
+import os
+import zipfile
+from array import array
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import custom_constants as c
+from utils import optional_module
+
+# numpy (.npz files) and pyarrow (.parquet files) are optional, and only imported when such a file is used
+
+Columns = List[Tuple[str, Callable]]
+
+# One row per (map, algorithm) of experiments.run_experiments
+RESULT_COLUMNS: Columns = [
+    ("run", int),
+    ("seed", int),  # -1 if unknown, e.g. for painted maps
+    ("grid_size", int),
+    ("density", float),
+    ("algorithm", str),
+    ("runtime", float),  # Seconds
+    ("expansions", int),
+    ("path_cost", float),  # inf if no path was found, nan for the paths of the unweighted searches
+    ("path_steps", int),  # -1 if no path was found
+    ("generated", int),
+    ("peak_frontier", int),
+    ("peak_visited", int),
+    ("reopened", int),
+]
+# One row per run of local_search.run_tests
+LOCAL_SEARCH_COLUMNS: Columns = [
+    ("Run_Number", int),
+    ("Maps_Per_Run", int),
+    ("Successes", int),
+    ("Failures", int),
+    ("Success_Rate", float),  # Percent
+    ("Avg_Path_Length", float),  # nan if unknown or no map of the run was solved
+]
+FORMATS = (".csv", ".npz", ".parquet")
+# Typecode of the array buffers holding the numeric columns
+TYPECODES = {int: 'q', float: 'd'}
+READ_CHUNK_ROWS = 10000  # Rows read at a time, so the parsed rows never pile up
+
+
+def results_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown results format {extension!r}, use one of {', '.join(FORMATS)}")
+    if extension == ".npz" and optional_module("numpy") is None:
+        raise ImportError("numpy is required to write .npz results")
+    if extension == ".parquet" and optional_module("pyarrow.parquet") is None:
+        raise ImportError("pyarrow is required to write .parquet results")
+    return extension
+
+
+class ResultsSink:
+    """
+    Buffered writer of typed rows. Use as a context manager, or call close() to write the last rows.
+    """
+
+    def __init__(self, path: str, columns: Columns = RESULT_COLUMNS, flush_every: int = c.RESULTS_FLUSH_EVERY):
+        """
+        :param path: file to write, its extension picks the format
+        :param columns: (name, type) of every column, rows give their values in this order
+        :param flush_every: rows buffered before they are written out
+        """
+        self.path = path
+        self.columns = columns
+        self.flush_every = flush_every
+        self.format = results_format(path)
+        self.pending = []
+        self.rows_written = 0
+        if self.format == ".csv":
+            self.file = open(path, "w", newline="")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow([name for name, _ in columns])
+        elif self.format == ".npz":
+            # Kept in compact typed buffers until close, npz files can't be appended to
+            self.buffers = [array(TYPECODES[kind]) if kind in TYPECODES else [] for _, kind in columns]
+        else:
+            pa, pq = optional_module("pyarrow"), optional_module("pyarrow.parquet")
+            self.schema = pa.schema([(name, {int: pa.int64(), float: pa.float64()}.get(kind, pa.string()))
+                                     for name, kind in columns])
+            self.writer = pq.ParquetWriter(path, self.schema)
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, row: Sequence) -> None:
+        self.pending.append(row)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[Sequence]) -> None:
+        self.pending.extend(rows)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        # Cast every value to its column type, so a stray string or numpy scalar fails here, not on reading
+        values = [array(TYPECODES[kind], column) if kind in TYPECODES else list(map(kind, column))
+                  for (_, kind), column in zip(self.columns, zip(*self.pending))]
+        if self.format == ".csv":
+            self.writer.writerows(zip(*values))
+            self.file.flush()
+        elif self.format == ".npz":
+            for buffer, column in zip(self.buffers, values):
+                buffer.extend(column)
+        else:
+            pa = optional_module("pyarrow")
+            table = pa.Table.from_pydict({name: list(column) for (name, _), column in zip(self.columns, values)},
+                                         schema=self.schema)
+            self.writer.write_table(table)
+        self.rows_written += len(self.pending)
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self.format == ".csv":
+            self.file.close()
+        elif self.format == ".npz":
+            np = optional_module("numpy")
+            np.savez(self.path, **{name: np.asarray(buffer) for (name, _), buffer in zip(self.columns, self.buffers)})
+        else:
+            self.writer.close()
+
+
+def iter_results(path: str, columns: Columns = RESULT_COLUMNS,
+                 chunk_rows: int = READ_CHUNK_ROWS) -> Iterator[Dict[str, Sequence]]:
+    """
+    Read a results file written by a ResultsSink a chunk of rows at a time, so files of any length are
+    read in bounded memory.
+    :param columns: schema of the file, gives the types of the CSV columns
+    :param chunk_rows: rows per chunk
+    :return: per chunk, column name -> values: numpy arrays for .npz / .parquet, typed arrays or lists for .csv
+    """
+    extension = results_format(path)
+    if extension == ".npz":
+        yield from _npz_chunks(path, chunk_rows)
+        return
+    if extension == ".parquet":
+        for batch in optional_module("pyarrow.parquet").ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield {name: column.to_numpy(zero_copy_only=False) for name, column in zip(batch.schema.names,
+                                                                                       batch.columns)}
+        return
+
+    kinds = dict(columns)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        names = next(reader, [])
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+            yield {name: array(TYPECODES[kinds.get(name, str)], map(kinds.get(name, str), column))
+                   if kinds.get(name, str) in TYPECODES else list(column)
+                   for name, column in zip(names, zip(*chunk))}
+
+
+def _npz_chunks(path: str, chunk_rows: int) -> Iterator[Dict[str, Sequence]]:
+    """
+    Slices of the columns of an .npz file, read straight from the (uncompressed) .npy members of the archive
+    instead of loading whole columns.
+    """
+    np = optional_module("numpy")
+    with zipfile.ZipFile(path) as archive:
+        members = [name for name in archive.namelist() if name.endswith(".npy")]
+        files, dtypes, rows = [], [], None
+        try:
+            for member in members:
+                f = archive.open(member)
+                files.append(f)
+                version = np.lib.format.read_magic(f)
+                read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                               else np.lib.format.read_array_header_2_0)
+                shape, _, dtype = read_header(f)
+                if dtype.hasobject or len(shape) != 1:
+                    raise ValueError(f"Column {member} of {path} is not a flat array of plain values")
+                dtypes.append(dtype)
+                rows = shape[0] if rows is None else min(rows, shape[0])
+            for start in range(0, rows or 0, chunk_rows):
+                count = min(chunk_rows, rows - start)
+                yield {member[:-len(".npy")]: np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype)
+                       for member, f, dtype in zip(members, files, dtypes)}
+        finally:
+            for f in files:
+                f.close()
+
+
+def read_results(path: str, columns: Columns = RESULT_COLUMNS) -> Dict[str, Sequence]:
+    """
+    Load a results file written by a ResultsSink.
+    :param columns: schema of the file, gives the types of the CSV columns
+    :return: column name -> values: numpy arrays for .npz / .parquet, typed arrays or lists for .csv
+    """
+    extension = results_format(path)
+    if extension == ".npz":
+        with optional_module("numpy").load(path) as data:
+            return {name: data[name] for name in data.files}
+    if extension == ".parquet":
+        table = optional_module("pyarrow.parquet").read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+    kinds = dict(columns)
+    with open(path, newline="") as f:
+        names = next(csv.reader(f), [])
+    result = {name: array(TYPECODES[kinds.get(name, str)]) if kinds.get(name, str) in TYPECODES else []
+              for name in names}
+    for chunk in iter_results(path, columns):
+        for name, values in chunk.items():
+            result[name].extend(values)
+    return result
@@ -0,0 +1,70 @@
+"""
+Cache of search results.
+
+Searches on an unchanged map give the same answer every time, so their results
+are kept keyed by (grid size, grid fingerprint, algorithm, start, goal). The
+fingerprint (see GridArray) changes with every cell edit, so a stale entry can
+never be returned: after an edit the key is simply different, and the old
+entries age out of the cache.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import custom_constants as c
+
+
+class SearchCache:
+    """
+    Bounded mapping with LRU or FIFO eviction and hit/miss counters.
+    """
+
+    def __init__(self, max_size: int = c.SEARCH_CACHE_SIZE, policy: str = c.SEARCH_CACHE_POLICY):
+        """
+        :param max_size: entries kept, 0 disables the cache
+        :param policy: "lru" evicts the least recently used entry, "fifo" the oldest one
+        """
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_size = max_size
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        :return: the cached value, None on a miss
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == "lru":
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: hits, misses, evictions, current size and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# Shared by every GridModel of the process, so identical maps rebuilt from the same seed hit too
+shared_cache = SearchCache()
@@ -0,0 +1,669 @@
+"""
+Shared search core used by the Grid pathfinding algorithms.
+
+The searches run on the flat, padded buffers of a GridArray: neighbours are
+found by adding the array's offsets to a flat index, and the wall border
+makes bounds checks unnecessary. Instead of carrying a copy of the whole path
+on every frontier entry, each search records the predecessor of every
+discovered cell in a flat array and rebuilds the path once, when the goal is
+reached.
+
+Every search takes an optional `stats` dict and stores its work counters in
+it, so the algorithms can be compared by the work they do as well as by their
+runtime, which is too noisy on small maps:
+
+- expanded: cells whose neighbours were examined
+- generated: frontier insertions, the start included
+- peak_frontier: most entries the frontier (open list) held at once
+- peak_visited: cells that got a cost or a parent, the size of the visited set
+- reopened: expansions of a cell that had already been expanded
+
+Cells are expanded at most once by all of these searches (BFS marks cells when
+they are queued, and the heuristics of the weighted searches are consistent),
+so `reopened` is 0 here; the incremental and hierarchical planners report it too.
+"""
+import heapq
+import re
+from array import array
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from grid_array import COST_TABLE, GridArray, INF, UNWEIGHTED_BLOCKED
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+NO_PARENT = -1
+STAT_FIELDS = ('expanded', 'generated', 'peak_frontier', 'peak_visited', 'reopened')
+
+
+def record_stats(stats: Optional[Dict], expanded: int, generated: int, peak_frontier: int,
+                 peak_visited: int, reopened: int = 0) -> None:
+    """
+    Store the work counters of a search in `stats`, if given. See STAT_FIELDS.
+    """
+    if stats is not None:
+        stats.update(expanded=expanded, generated=generated, peak_frontier=peak_frontier,
+                     peak_visited=peak_visited, reopened=reopened)
+
+
+def stale_entries(heap: list, best_cost: array) -> int:
+    """
+    Count the entries of a lazy-deletion heap that a cheaper entry for the same cell replaced.
+    Every insertion for an already reached cell makes exactly one older entry stale, so
+    cells reached = insertions - stale entries (popped or still queued), without scanning the grid.
+    :param heap: entries ending in (cost, index)
+    """
+    return sum(entry[-2] > best_cost[entry[-1]] for entry in heap)
+
+
+def reconstruct_path(parents: array, goal_index: int) -> List[int]:
+    """
+    Walk the predecessor array back from the goal.
+    :param parents: flat predecessor array, NO_PARENT marks the start cell
+    :param goal_index: flat index of the goal cell
+    :return: flat indices of the path start -> goal
+    """
+    path = []
+    index = goal_index
+    while index != NO_PARENT:
+        path.append(index)
+        index = parents[index]
+    path.reverse()
+    return path
+
+
+def unweighted_search(grid: GridArray,
+                      start: Tuple[int, int],
+                      goal: Tuple[int, int],
+                      depth_first: bool = False,
+                      stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    BFS (FIFO frontier) or DFS (LIFO frontier) over cells that are not walls or hydras.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goal: (x, y) tuple
+    :param depth_first: pop from the back of the frontier instead of the front
+    :param stats: optional dict that receives the work counters
+    :return: path or None if the goal is unreachable
+    """
+    cells = grid.cells
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    goal_index = grid.index(*goal)
+    parents = array('i', [NO_PARENT]) * len(cells)
+    visited = bytearray(len(cells))
+    visited[start_index] = 1
+
+    frontier = deque([start_index])
+    pop = frontier.pop if depth_first else frontier.popleft
+    expanded = 0
+    peak_frontier = 1
+    path = None
+    while frontier:
+        index = pop()
+        if index == goal_index:
+            path = grid.path_to_coords(reconstruct_path(parents, goal_index))
+            break
+        expanded += 1
+        for offset in offsets:
+            next_index = index + offset
+            if not visited[next_index] and not UNWEIGHTED_BLOCKED[cells[next_index]]:
+                visited[next_index] = 1
+                parents[next_index] = index
+                frontier.append(next_index)
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
+    # Every cell is marked visited when it is queued and popped at most once
+    generated = expanded + (path is not None) + len(frontier)
+    record_stats(stats, expanded, generated, peak_frontier, generated)
+    return path
+
+
+def weighted_search(grid: GridArray,
+                    start: Tuple[int, int],
+                    goal: Tuple[int, int],
+                    heuristic: Optional[Callable[[int], float]] = None,
+                    stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    Best-first search over the cost buffer: UCS without a heuristic, A* with one.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goal: (x, y) tuple
+    :param heuristic: h(index) estimate of the remaining cost from a flat index, None for UCS
+    :param stats: optional dict that receives the work counters
+    :return: path or None if the goal is unreachable
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    goal_index = grid.index(*goal)
+    parents = array('i', [NO_PARENT]) * len(costs)
+    best_cost = array('d', [INF]) * len(costs)
+    best_cost[start_index] = 0
+
+    h = heuristic or (lambda index: 0)
+    heap = [(h(start_index), 0, start_index)]
+    expanded = 0
+    stale = 0
+    peak_frontier = 1
+    path = None
+    while heap:
+        _, cost_so_far, index = heapq.heappop(heap)
+        if index == goal_index:
+            path = grid.path_to_coords(reconstruct_path(parents, goal_index))
+            break
+        if cost_so_far > best_cost[index]:
+            stale += 1
+            continue  # Stale entry, a cheaper route to this cell was found later
+        expanded += 1
+        for offset in offsets:
+            next_index = index + offset
+            # Impassable cells cost inf, so they never pass this test
+            new_cost = cost_so_far + costs[next_index]
+            if new_cost < best_cost[next_index]:
+                best_cost[next_index] = new_cost
+                parents[next_index] = index
+                heapq.heappush(heap, (new_cost + h(next_index), new_cost, next_index))
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if stats is not None:
+        # Every insertion was either popped (expanded, stale or the goal) or is still queued
+        generated = expanded + stale + (path is not None) + len(heap)
+        record_stats(stats, expanded, generated, peak_frontier, generated - stale - stale_entries(heap, best_cost))
+    return path
+
+
+def manhattan_heuristic(grid: GridArray, goal: Tuple[int, int]) -> Callable[[int], float]:
+    """
+    :return: h(index) giving the Manhattan distance from a flat index to the goal
+    """
+    width = grid.width
+    goal_row, goal_col = divmod(grid.index(*goal), width)
+
+    def h(index: int) -> float:
+        row, col = divmod(index, width)
+        return abs(col - goal_col) + abs(row - goal_row)
+
+    return h
+
+
+# Distance fields ________________________
+# One Dijkstra from the goal gives every cell's cost to reach it. From then on the
+# cheapest path from any start is found by stepping to the neighbour with the
+# smallest (cost of entering it + its distance), in O(path length).
+
+
+def distance_field(grid: GridArray, goal: Tuple[int, int], stats: Optional[Dict] = None) -> array:
+    """
+    Cost of the cheapest path from every cell to the goal.
+    :param grid: array-backed grid
+    :param goal: (x, y) tuple
+    :param stats: optional dict that receives the work counters
+    :return: flat array indexed like grid.costs, inf where the goal is unreachable
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    goal_index = grid.index(*goal)
+    distance = array('d', [INF]) * len(costs)
+    distance[goal_index] = 0
+
+    heap = [(0, goal_index)]
+    expanded = 0
+    stale = 0
+    peak_frontier = 1
+    while heap:
+        cost_so_far, index = heapq.heappop(heap)
+        if cost_so_far > distance[index]:
+            stale += 1
+            continue  # Stale entry
+        expanded += 1
+        # Any neighbour that can be stood on reaches this cell by paying for entering it
+        new_cost = cost_so_far + costs[index]
+        for offset in offsets:
+            next_index = index + offset
+            if new_cost < distance[next_index] and costs[next_index] != INF:
+                distance[next_index] = new_cost
+                heapq.heappush(heap, (new_cost, next_index))
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if stats is not None:
+        # Runs until the heap is empty, so every reached cell was expanded
+        record_stats(stats, expanded, expanded + stale, peak_frontier, expanded)
+    return distance
+
+
+def cost_field(grid: GridArray, start: Tuple[int, int], stats: Optional[Dict] = None) -> array:
+    """
+    Cost of the cheapest path from the start to every cell, the mirror image of distance_field.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param stats: optional dict that receives the work counters
+    :return: flat array indexed like grid.costs, inf where the cell can't be reached
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    best_cost = array('d', [INF]) * len(costs)
+    best_cost[start_index] = 0
+
+    heap = [(0, start_index)]
+    expanded = 0
+    stale = 0
+    peak_frontier = 1
+    while heap:
+        cost_so_far, index = heapq.heappop(heap)
+        if cost_so_far > best_cost[index]:
+            stale += 1
+            continue  # Stale entry
+        expanded += 1
+        for offset in offsets:
+            next_index = index + offset
+            new_cost = cost_so_far + costs[next_index]
+            if new_cost < best_cost[next_index]:
+                best_cost[next_index] = new_cost
+                heapq.heappush(heap, (new_cost, next_index))
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if stats is not None:
+        record_stats(stats, expanded, expanded + stale, peak_frontier, expanded)
+    return best_cost
+
+
+def shortest_path_tree(grid: GridArray,
+                       start: Tuple[int, int],
+                       goals: List[Tuple[int, int]],
+                       stats: Optional[Dict] = None) -> Tuple[array, array]:
+    """
+    Dijkstra from one start, run until every goal is settled (or nothing is left to expand).
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goals: (x, y) cells whose cheapest paths are needed
+    :param stats: optional dict that receives the work counters
+    :return: cost and predecessor arrays; a path to any settled goal is reconstruct_path(parents, goal)
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    remaining = {grid.index(*goal) for goal in goals}
+    parents = array('i', [NO_PARENT]) * len(costs)
+    best_cost = array('d', [INF]) * len(costs)
+    best_cost[start_index] = 0
+
+    heap = [(0, start_index)]
+    expanded = 0
+    stale = 0
+    peak_frontier = 1
+    while heap and remaining:
+        cost_so_far, index = heapq.heappop(heap)
+        if cost_so_far > best_cost[index]:
+            stale += 1
+            continue  # Stale entry
+        remaining.discard(index)
+        expanded += 1
+        for offset in offsets:
+            next_index = index + offset
+            new_cost = cost_so_far + costs[next_index]
+            if new_cost < best_cost[next_index]:
+                best_cost[next_index] = new_cost
+                parents[next_index] = index
+                heapq.heappush(heap, (new_cost, next_index))
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if stats is not None:
+        record_stats(stats, expanded, expanded + stale + len(heap), peak_frontier,
+                     expanded + len(heap) - stale_entries(heap, best_cost))
+    return best_cost, parents
+
+
+def start_distance(grid: GridArray, distance: array, index: int) -> float:
+    """
+    Cost-to-goal of a start cell. Like in the searches, the start does not have to be passable:
+    the field holds inf on lava or the hydra, so from there it is the cheapest step to a neighbour
+    plus that neighbour's distance.
+    :param grid: array-backed grid the field was computed on
+    :param distance: result of distance_field
+    :param index: flat index of the start
+    :return: cost of the cheapest path without the start cell, inf if there is none
+    """
+    costs = grid.costs
+    if distance[index] != INF or costs[index] != INF:
+        return distance[index]
+    return min(costs[index + offset] + distance[index + offset] for offset in grid.offsets)
+
+
+def descend_distance_field(grid: GridArray, distance: array,
+                           start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Follow a distance field downhill from start to its goal.
+    :param grid: array-backed grid the field was computed on
+    :param distance: result of distance_field
+    :param start: (x, y) tuple, passable or not (see start_distance)
+    :return: a cheapest path or None if the goal is unreachable
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    index = grid.index(*start)
+    if start_distance(grid, distance, index) == INF:
+        return None
+    path = [index]
+    while distance[index] != 0:
+        index = min((index + offset for offset in offsets), key=lambda cell: costs[cell] + distance[cell])
+        path.append(index)
+    return grid.path_to_coords(path)
+
+
+# Bidirectional searches _________________
+# Both searches grow one tree from the start and one from the goal, and join them
+# where they meet. The goal side keeps, for every cell it reaches, the next cell
+# on the way to the goal, so the joined path is the start-side predecessors up to
+# the meeting cell followed by the goal-side successors from it.
+
+
+def _join_paths(parents: array, successors: array, meeting_index: int) -> List[int]:
+    """
+    :return: flat indices start -> meeting cell -> goal
+    """
+    path = reconstruct_path(parents, meeting_index)
+    index = successors[meeting_index]
+    while index != NO_PARENT:
+        path.append(index)
+        index = successors[index]
+    return path
+
+
+def bidirectional_bfs(grid: GridArray,
+                      start: Tuple[int, int],
+                      goal: Tuple[int, int],
+                      stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    BFS from both ends, one whole layer at a time, always growing the smaller frontier.
+    Finds a path with as few steps as BFS does.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goal: (x, y) tuple
+    :param stats: optional dict that receives the work counters
+    :return: path or None if the goal is unreachable
+    """
+    cells = grid.cells
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    goal_index = grid.index(*goal)
+    # links[0]: predecessor towards the start, links[1]: successor towards the goal
+    links = (array('i', [NO_PARENT]) * len(cells), array('i', [NO_PARENT]) * len(cells))
+    # Number of steps from the start / to the goal, -1 = not reached by that side
+    depth = (array('i', [-1]) * len(cells), array('i', [-1]) * len(cells))
+    depth[0][start_index] = 0
+    depth[1][goal_index] = 0
+    frontiers = ([start_index], [goal_index])
+
+    expanded = 0
+    generated = peak_frontier = len({start_index, goal_index})
+    meeting_index = start_index if start_index == goal_index else NO_PARENT
+    while meeting_index == NO_PARENT and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_depth, other_depth, own_links = depth[side], depth[1 - side], links[side]
+        best_length = INF
+        next_frontier = []
+        for index in frontiers[side]:
+            expanded += 1
+            for offset in offsets:
+                next_index = index + offset
+                if own_depth[next_index] != -1 or UNWEIGHTED_BLOCKED[cells[next_index]]:
+                    continue
+                own_depth[next_index] = own_depth[index] + 1
+                own_links[next_index] = index
+                next_frontier.append(next_index)
+                # Finish the layer before stopping: another cell of it may meet the other side closer
+                if other_depth[next_index] != -1 and own_depth[next_index] + other_depth[next_index] < best_length:
+                    best_length = own_depth[next_index] + other_depth[next_index]
+                    meeting_index = next_index
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        generated += len(next_frontier)
+        peak_frontier = max(peak_frontier, len(frontiers[0]) + len(frontiers[1]))
+
+    # Cells are marked with their depth when they are queued, so every generated cell is visited
+    record_stats(stats, expanded, generated, peak_frontier, generated)
+    if meeting_index == NO_PARENT:
+        return None
+    return grid.path_to_coords(_join_paths(links[0], links[1], meeting_index))
+
+
+def bidirectional_astar(grid: GridArray,
+                        start: Tuple[int, int],
+                        goal: Tuple[int, int],
+                        stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    A* from both ends, always expanding the smaller open list.
+    Moving from a to b costs costs[b], so the goal side, which walks the moves backwards,
+    pays the cost of the cell it comes from.
+    Both sides are ordered by the same balanced potential, half the difference of the
+    Manhattan distances to the goal and to the start (added by the start side, subtracted
+    by the goal side), which keeps both heuristics consistent with each other. A path through
+    a cell reached by both sides costs the sum of the two costs; the cheapest one seen so far
+    costs mu, and once the smallest keys of the two open lists add up to mu or more no
+    cheaper path can exist and the search stops.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goal: (x, y) tuple
+    :param stats: optional dict that receives the work counters
+    :return: path with the same cost as A*, or None if the goal is unreachable
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    start_index = grid.index(*start)
+    goal_index = grid.index(*goal)
+    links = (array('i', [NO_PARENT]) * len(costs), array('i', [NO_PARENT]) * len(costs))
+    best_cost = (array('d', [INF]) * len(costs), array('d', [INF]) * len(costs))
+    best_cost[0][start_index] = 0
+    best_cost[1][goal_index] = 0
+    width = grid.width
+    goal_row, goal_col = divmod(goal_index, width)
+    start_row, start_col = divmod(start_index, width)
+
+    def potential(index: int) -> float:
+        row, col = divmod(index, width)
+        return (abs(col - goal_col) + abs(row - goal_row) - abs(col - start_col) - abs(row - start_row)) / 2
+
+    heaps = ([(potential(start_index), 0, start_index)], [(-potential(goal_index), 0, goal_index)])
+    expanded = 0
+    stale = 0
+    peak_frontier = 2
+    mu = 0 if start_index == goal_index else INF
+    meeting_index = start_index
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < mu:
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, sign = heaps[side], 1 - 2 * side
+        own_cost, other_cost, own_links = best_cost[side], best_cost[1 - side], links[side]
+        _, cost_so_far, index = heapq.heappop(heap)
+        if cost_so_far > own_cost[index]:
+            stale += 1
+            continue  # Stale entry, a cheaper route to this cell was found later
+        expanded += 1
+        # Going backwards, every move leaving this cell costs what entering it does
+        backward_step = costs[index]
+        for offset in offsets:
+            next_index = index + offset
+            if costs[next_index] == INF and next_index != start_index:
+                continue
+            new_cost = cost_so_far + (costs[next_index] if side == 0 else backward_step)
+            if new_cost < own_cost[next_index]:
+                own_cost[next_index] = new_cost
+                own_links[next_index] = index
+                heapq.heappush(heap, (new_cost + sign * potential(next_index), new_cost, next_index))
+                if new_cost + other_cost[next_index] < mu:
+                    mu = new_cost + other_cost[next_index]
+                    meeting_index = next_index
+        if len(heaps[0]) + len(heaps[1]) > peak_frontier:
+            peak_frontier = len(heaps[0]) + len(heaps[1])
+
+    if stats is not None:
+        generated = expanded + stale + len(heaps[0]) + len(heaps[1])
+        visited = generated - stale - stale_entries(heaps[0], best_cost[0]) - stale_entries(heaps[1], best_cost[1])
+        record_stats(stats, expanded, generated, peak_frontier, visited)
+    if mu == INF:
+        return None
+    return grid.path_to_coords(_join_paths(links[0], links[1], meeting_index))
+
+
+# Jump Point Search ______________________
+# JPS for 4-connected grids. On cells that cost exactly 1 there are many equally
+# short paths between two cells; JPS only follows one canonical ordering of them
+# (vertical moves first) and "jumps" in a straight line over cells where nothing
+# can change, adding just the cells where the path may have to turn to the heap.
+# That argument only holds for uniform costs, so the jumps stop next to any cell
+# with another finite cost (mountains): such cells, and the cells around them,
+# are expanded in every direction like plain A* would.
+#
+# A jump walks cell by cell. Every cell it passes over ends its own jump in that
+# direction at the same place, so the end is remembered for all of them and each
+# cell is walked over at most once per direction and search.
+
+# 1 for the cells that cost exactly 1 / have another finite cost, indexed by cell id
+UNIFORM_CELLS = bytes(cost == 1 for cost in COST_TABLE)
+NON_UNIFORM_CELLS = bytes(cost not in (1, INF) for cost in COST_TABLE)
+NOT_WALKED = -2  # Jump end of a cell no jump has passed yet
+_NON_ZERO = re.compile(b'[^\x00]')
+
+
+class JumpTables:
+    """
+    Where a jump started on each cell ends, for the four directions of one grid and goal,
+    filled in as the search asks for them.
+    """
+
+    def __init__(self, grid: GridArray, goal_index: int):
+        self.width = grid.width
+        self.goal_index = goal_index
+        self.uniform = grid.cells.translate(UNIFORM_CELLS)
+        # Mountains are inside the wall border, so their neighbours are always in the buffer
+        self.near_non_uniform = bytearray(len(grid.cells))
+        for match in _NON_ZERO.finditer(grid.cells.translate(NON_UNIFORM_CELLS)):
+            for offset in grid.offsets:
+                self.near_non_uniform[match.start() + offset] = 1
+        self.ends = {step: array('i', [NOT_WALKED]) * len(grid.cells) for step in grid.offsets}
+
+    def is_jump_point(self, index: int, step: int) -> bool:
+        """
+        :return: True if a jump in direction step has to stop on this uniform cell
+        """
+        if index == self.goal_index or self.near_non_uniform[index]:
+            return True
+        uniform = self.uniform
+        horizontal = step in (-1, 1)
+        # Forced neighbour: the side cell is open but the cell behind it is not,
+        # so the only shortest way to reach it may go through this cell
+        for side in (-self.width, self.width) if horizontal else (-1, 1):
+            if uniform[index + side] and not uniform[index + side - step]:
+                return True
+        # Vertical jumps also stop where a horizontal jump from a side cell would succeed
+        return not horizontal and (self.jump(index + 1, 1) != NO_PARENT or self.jump(index - 1, -1) != NO_PARENT)
+
+    def jump(self, index: int, step: int) -> int:
+        """
+        Move from index in direction step until a jump point is found.
+        :return: flat index of the jump point, NO_PARENT if the jump runs into a blocked or non-uniform cell
+        """
+        ends = self.ends[step]
+        passed = []
+        end = ends[index]
+        while end == NOT_WALKED:
+            if not self.uniform[index]:
+                end = NO_PARENT
+            elif self.is_jump_point(index, step):
+                end = index
+            else:
+                passed.append(index)
+                index += step
+                end = ends[index]
+        ends[index] = end
+        for cell in passed:
+            ends[cell] = end
+        return end
+
+
+def _fill_jumps(jump_points: List[int], width: int) -> List[int]:
+    """
+    Expand a path of jump points, all in a straight line from the previous one, into every cell.
+    """
+    path = jump_points[:1]
+    for previous, current in zip(jump_points, jump_points[1:]):
+        step = 1 if previous // width == current // width else width
+        if current < previous:
+            step = -step
+        path.extend(range(previous + step, current + step, step))
+    return path
+
+
+def jump_point_search(grid: GridArray,
+                      start: Tuple[int, int],
+                      goal: Tuple[int, int],
+                      stats: Optional[Dict] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    A* with the Manhattan heuristic that only expands jump points.
+    Returns paths of the same cost as A*, mountains included.
+    :param grid: array-backed grid
+    :param start: (x, y) tuple
+    :param goal: (x, y) tuple
+    :param stats: optional dict that receives the work counters
+    :return: path or None if the goal is unreachable
+    """
+    costs = grid.costs
+    offsets = grid.offsets
+    width = grid.width
+    start_index = grid.index(*start)
+    goal_index = grid.index(*goal)
+    tables = JumpTables(grid, goal_index)
+    near_non_uniform = tables.near_non_uniform
+    parents = array('i', [NO_PARENT]) * len(costs)
+    arrived_by = array('i', [0]) * len(costs)  # Step that reached each jump point, 0 for the start
+    best_cost = array('d', [INF]) * len(costs)
+    best_cost[start_index] = 0
+
+    h = manhattan_heuristic(grid, goal)
+    heap = [(h(start_index), 0, start_index)]
+    expanded = 0
+    stale = 0
+    peak_frontier = 1
+    path = None
+    while heap:
+        _, cost_so_far, index = heapq.heappop(heap)
+        if index == goal_index:
+            path = grid.path_to_coords(_fill_jumps(reconstruct_path(parents, goal_index), width))
+            break
+        if cost_so_far > best_cost[index]:
+            stale += 1
+            continue  # Stale entry, a cheaper route to this cell was found later
+        expanded += 1
+
+        # Prune the directions a canonical path can't take, except where the costs aren't uniform
+        step = arrived_by[index]
+        if step == 0 or costs[index] != 1 or near_non_uniform[index]:
+            directions = offsets
+        elif step in (-1, 1):
+            directions = (step, -width, width)
+        else:
+            directions = (step, -1, 1)
+
+        for direction in directions:
+            next_index = index + direction
+            cell_cost = costs[next_index]
+            if cell_cost == INF:
+                continue
+            if cell_cost == 1:
+                next_index = tables.jump(next_index, direction)
+                if next_index == NO_PARENT:
+                    continue
+                new_cost = cost_so_far + abs(next_index - index) // abs(direction)
+            else:
+                new_cost = cost_so_far + cell_cost
+            if new_cost < best_cost[next_index]:
+                best_cost[next_index] = new_cost
+                parents[next_index] = index
+                arrived_by[next_index] = direction
+                heapq.heappush(heap, (new_cost + h(next_index), new_cost, next_index))
+        if len(heap) > peak_frontier:
+            peak_frontier = len(heap)
+    if stats is not None:
+        # Only jump points get a cost, so visited counts jump points rather than every cell passed over
+        generated = expanded + stale + (path is not None) + len(heap)
+        record_stats(stats, expanded, generated, peak_frontier, generated - stale - stale_entries(heap, best_cost))
+    return path
@@ -1,16 +1,11 @@
-import csv
 import matplotlib.pyplot as plt
 
-# Read the CSV file
-run_numbers = []
-success_rates = []
+from results_analysis import summarize_local_search
 
-with open("local_search_results.csv", "r", newline="") as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        run_numbers.append(int(row["Run_Number"]))
-        rate_str = row["Success_Rate"].replace('%', '')
-        success_rates.append(float(rate_str))
+# Read the results file once: success rate per run and the averages
+summary = summarize_local_search("local_search_results.csv")
+run_numbers = summary["Run_Number"]
+success_rates = summary["Success_Rate"]
 
 # Plot the results
 plt.figure(figsize=(10, 6))
@@ -22,20 +17,8 @@ plt.grid(True)
 plt.ylim(0, 100)  # success rate is from 0% to 100%
 plt.show()
 
-
-
-success_rates = []
-
-with open("local_search_results.csv", "r", newline="") as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        # Remove '%' sign if present and convert to float
-        rate_str = row["Success_Rate"].replace('%', '')
-        success_rates.append(float(rate_str))
-
 # Calculate average success rate
-if success_rates:
-    average_success_rate = sum(success_rates) / len(success_rates)
-    print(f"Average Success Rate: {average_success_rate:.2f}%")
+if len(success_rates):
+    print(f"Average Success Rate: {summary['average_success_rate']:.2f}%")
 else:
     print("No data found in local_search_results.csv.")
@@ -1,3 +1,7 @@
+import importlib
+from functools import lru_cache
+
+
 def ask_input() -> int:
     """
     Asks the user for a grid size input and returns the value.
@@ -16,3 +20,16 @@ def ask_input() -> int:
 
     return grid_size
 
+
+@lru_cache(maxsize=None)
+def optional_module(name: str):
+    """
+    Import an optional dependency on first use, so that commands that never need it don't pay for importing it
+    (numpy alone takes ~100 ms).
+    :param name: module name, e.g. "numpy" or "pyarrow.parquet"
+    :return: the module, None if it isn't installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
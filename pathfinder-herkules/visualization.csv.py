@@ -1,28 +1,25 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from itertools import chain
 
-# Load the CSV file into a DataFrame
-df = pd.read_csv("results.csv")
-
-# Verify the column names
-print("Columns in DataFrame:", df.columns.tolist())
+from results_analysis import summarize_results
 
 # Define the list of algorithms to include
-algorithms = ['BFS', 'DFS', 'UCS', 'A*']
+algorithms = ['BFS', 'DFS', 'UCS', 'A*', 'JPS', 'Bi-BFS', 'Bi-A*']
 
-# Check if all required algorithms are present in the DataFrame
-missing_algorithms = [alg for alg in algorithms if alg not in df.columns]
-if missing_algorithms:
-    print(f"Missing columns in CSV: {missing_algorithms}")
-    raise ValueError(f"The following required columns are missing in the CSV: {missing_algorithms}")
+# Aggregate the results (one row per run and algorithm, .csv, .npz or .parquet) chunk by chunk,
+# only the per-algorithm aggregates are kept in memory
+summary = summarize_results("results.csv", algorithms)
 
-# Convert the DataFrame from wide to long format for the line plot
-df_long = df.melt(id_vars=["Run_number"], var_name="Algorithm", value_name="Runtime")
+# Check if all required algorithms are present in the results
+missing_algorithms = [alg for alg in algorithms if alg not in summary.algorithms]
+if missing_algorithms:
+    print(f"Missing algorithms in results: {missing_algorithms}")
+    raise ValueError(f"The following required algorithms are missing in the results: {missing_algorithms}")
 
-# Filter out the data to include only the selected algorithms
-df_long = df_long[df_long['Algorithm'].isin(algorithms)]
+# One row per algorithm and grid size: mean / median / p95 runtime, success rate, fastest count
+df_stats = pd.DataFrame(summary.table())
+print(df_stats.to_string(index=False))
 
 # Set the overall theme for the plots
 sns.set_theme(style="whitegrid")
@@ -31,21 +28,22 @@ sns.set_theme(style="whitegrid")
 fig, axes = plt.subplots(1, 2, figsize=(10, 5))
 
 # ----------------------------
-# 1. Line Plot: Runtime vs Run Number
+# 1. Line Plot: Median Runtime vs Grid Size
 # ----------------------------
 sns.lineplot(
     ax=axes[0],
-    data=df_long,
-    x="Run_number",
-    y="Runtime",
-    hue="Algorithm",
+    data=df_stats,
+    x="grid_size",
+    y="median_runtime",
+    hue="algorithm",
+    hue_order=algorithms,
     marker="o",
     palette="tab10"
 )
 
 # Customize the first subplot
-axes[0].set_title("Runtime of Algorithms Over Multiple Runs", fontsize=20)
-axes[0].set_xlabel("Run Number", fontsize=16)
+axes[0].set_title("Median Runtime of Algorithms by Grid Size", fontsize=20)
+axes[0].set_xlabel("Grid Size", fontsize=16)
 axes[0].set_ylabel("Runtime (seconds)", fontsize=16)
 axes[0].legend(title="Algorithm", fontsize=14, title_fontsize=16)
 axes[0].tick_params(axis='both', which='major', labelsize=14)
@@ -54,20 +52,9 @@ axes[0].tick_params(axis='both', which='major', labelsize=14)
 # 2. Bar Chart: Count of Fastest Algorithms
 # ----------------------------
 
-# Determine the fastest algorithm(s) for each run
-min_runtimes = df[algorithms].min(axis=1)
-
-# Find all algorithms that have the minimum runtime in each run
-fastest_algorithms = df[algorithms].apply(lambda row: row[row == row.min()].index.tolist(), axis=1)
-
-# Flatten the list of lists to a single list
-fastest_algorithms_flat = list(chain.from_iterable(fastest_algorithms))
-
-# Count how many times each algorithm was the fastest
-fastest_counts = pd.Series(fastest_algorithms_flat).value_counts()
-
-# Ensure all algorithms are present, even with zero counts
-fastest_counts = fastest_counts.reindex(algorithms, fill_value=0)
+# Count how many times each algorithm was the fastest (ties count for every tied algorithm),
+# with all algorithms present, even with zero counts
+fastest_counts = pd.Series(summary.fastest_counts()).reindex(algorithms, fill_value=0)
 
 # Sort the counts in ascending order
 fastest_counts_sorted = fastest_counts.sort_values()